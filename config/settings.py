@@ -74,6 +74,7 @@ ACCOUNT_EMAIL_VERIFICATION = "none"
 SOCIALACCOUNT_LOGIN_ON_GET = True
 
 MIDDLEWARE = [
+    'users.query_metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -107,13 +108,57 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite pragmas applied to every new connection. busy_timeout (milliseconds)
+# makes a blocked writer wait instead of failing with "database is locked".
+# IMMEDIATE transactions take the write lock at BEGIN, so they can wait for it
+# too, instead of failing when a read lock is upgraded mid-transaction.
+#
+# WAL lets readers run while a write is in progress. The journal mode is saved
+# in the database file, so it is not set by default: that would rewrite the
+# checked-in db.sqlite3 on every manage.py run. Switch a deployed database once
+# with `sqlite3 db.sqlite3 "PRAGMA journal_mode=WAL;"`, or set
+# SQLITE_JOURNAL_MODE=WAL in its environment.
+SQLITE_PRAGMAS = {
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 128 * 1024 * 1024)),
+    # Negative values are KiB, positive values pages.
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -20000)),
+    "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+}
+if os.environ.get("SQLITE_JOURNAL_MODE"):
+    SQLITE_PRAGMAS["journal_mode"] = os.environ["SQLITE_JOURNAL_MODE"]
+SQLITE_TRANSACTION_MODE = os.environ.get("SQLITE_TRANSACTION_MODE", "IMMEDIATE") or None
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ";".join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': SQLITE_TRANSACTION_MODE,
+        },
     }
 }
 
+# Optional read-only copy of the database (a replicated file, or db.sqlite3
+# itself for separate reader connections). Views wrapped in
+# users.db_router.read_replica read projects and plans from it.
+SQLITE_REPLICA_PATH = os.environ.get("SQLITE_REPLICA_PATH", "")
+if SQLITE_REPLICA_PATH:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': Path(SQLITE_REPLICA_PATH).expanduser(),
+        'OPTIONS': {
+            'init_command': ";".join(
+                [f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"]
+                + ["PRAGMA query_only=ON"]
+            ),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['users.db_router.ReadReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -158,3 +203,50 @@ MEDIA_ROOT = BASE_DIR / 'media'
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 
+
+# Recommendation scoring engine: "python" (default) or "numpy" (requires numpy).
+RECOMMENDATION_ENGINE = os.environ.get("RECOMMENDATION_ENGINE", "python")
+
+# Where cached recommendations live: "cache" (Django cache framework), "db"
+# (RecommendationSnapshot table) or "auto" (cache only when CACHES is set).
+RECOMMENDATION_CACHE_BACKEND = os.environ.get("RECOMMENDATION_CACHE_BACKEND", "auto")
+RECOMMENDATION_CACHE_TIMEOUT = int(os.environ.get("RECOMMENDATION_CACHE_TIMEOUT", 60 * 60 * 24))
+
+# Seconds a worker reuses the catalog version before re-reading it. Project
+# changes clear it at once only in the cache they were made against, so with
+# the default per-process cache other workers can serve stale recommendations
+# and pages for this long; set a shared CACHES backend for several workers.
+CATALOG_VERSION_CACHE_TIMEOUT = int(os.environ.get("CATALOG_VERSION_CACHE_TIMEOUT", 10))
+
+# Upper bound, in seconds, for cached subscription tiers. Entries also expire
+# when the subscription or approved premium request behind them ends.
+# Subscription changes drop the entry only in the cache they were made
+# against, so with the default per-process cache other workers can show the
+# old tier for this long; set a shared CACHES backend for several workers.
+SUBSCRIPTION_TIER_CACHE_TIMEOUT = int(os.environ.get("SUBSCRIPTION_TIER_CACHE_TIMEOUT", 60))
+
+# Count free-tier recommendation runs in the cache and write them to
+# DailyRecommendationUsage in batches (every FLUSH_SIZE users or FLUSH_INTERVAL
+# seconds). Needs a shared CACHES backend when running several workers.
+RECOMMENDATION_QUOTA_CACHE = os.environ.get("RECOMMENDATION_QUOTA_CACHE", "").lower() in ("1", "true", "yes")
+RECOMMENDATION_QUOTA_FLUSH_SIZE = int(os.environ.get("RECOMMENDATION_QUOTA_FLUSH_SIZE", 100))
+RECOMMENDATION_QUOTA_FLUSH_INTERVAL = int(os.environ.get("RECOMMENDATION_QUOTA_FLUSH_INTERVAL", 60))
+
+# Parsed project workspaces kept per process (LRU, keyed by project id and
+# content hash). 0 disables the cache.
+WORKSPACE_CACHE_SIZE = int(os.environ.get("WORKSPACE_CACHE_SIZE", 512))
+
+# Seconds logged-out home/catalog pages and catalog card fragments stay cached.
+# Keys include the catalog version; with the default per-process cache other
+# workers may serve a page up to this long after a project change. 0 disables.
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 300))
+
+# Seconds the per-process plan name -> id lookup is reused. Plan saves clear
+# it immediately in the process that made them.
+PLAN_IDS_CACHE_TIMEOUT = int(os.environ.get("PLAN_IDS_CACHE_TIMEOUT", 300))
+
+# Fraction of requests (0.0-1.0) whose SQL query count, SQL time and repeated
+# queries are recorded per view and sent back in a Server-Timing header. Staff
+# can read the per-process summary at /ops/query-metrics/. 0 disables.
+QUERY_METRICS_SAMPLE_RATE = float(os.environ.get("QUERY_METRICS_SAMPLE_RATE", 0))
+QUERY_METRICS_WINDOW = int(os.environ.get("QUERY_METRICS_WINDOW", 1000))
@@ -1,6 +1,6 @@
 from django.contrib import admin, messages
-from django.utils import timezone
-from .models import Plan, PremiumRequest, Project, Subscription, UserProfile
+from .models import Plan, PremiumRequest, Project, SavedProject, Subscription, UserProfile
+from .premium_request_service import approve_premium_requests, get_fallback_plan, reject_premium_requests
 
 
 @admin.register(UserProfile)
@@ -47,6 +47,14 @@ class ProjectAdmin(admin.ModelAdmin):
 	)
 
 
+@admin.register(SavedProject)
+class SavedProjectAdmin(admin.ModelAdmin):
+	list_display = ("user", "title", "source", "completed_tasks", "total_tasks", "created_at")
+	list_filter = ("source",)
+	search_fields = ("user__username", "user__email", "title", "key")
+	raw_id_fields = ("user", "project")
+
+
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
 	list_display = ("user", "plan", "start_date", "end_date", "is_active")
@@ -62,35 +70,13 @@ class PremiumRequestAdmin(admin.ModelAdmin):
 	actions = ["approve_requests", "reject_requests"]
 
 	def approve_requests(self, request, queryset):
-		fallback_plan = Plan.objects.filter(name__iexact="Pro Monthly").first()
-		if not fallback_plan:
-			fallback_plan = Plan.objects.filter(price__gt=0).order_by("price", "id").first()
+		fallback_plan = get_fallback_plan()
 		if not fallback_plan:
 			self.message_user(request, "Create a paid plan first (e.g., Pro Monthly).", level=messages.ERROR)
 			return
-		count = 0
-		for req in queryset.filter(status="pending"):
-			selected_plan = req.plan if req.plan and req.plan.price > 0 else fallback_plan
-			duration_days = 365 if selected_plan.name.lower().strip() == "pro yearly" else 30
-			Subscription.objects.filter(user=req.user, is_active=True).update(is_active=False)
-			Subscription.objects.create(
-				user=req.user,
-				plan=selected_plan,
-				start_date=timezone.now().date(),
-				end_date=timezone.now().date() + timezone.timedelta(days=duration_days),
-				is_active=True,
-			)
-			req.status = "approved"
-			req.reviewed_at = timezone.now()
-			req.save()
-			count += 1
+		count = approve_premium_requests(queryset, fallback_plan)
 		self.message_user(request, f"Approved {count} request(s).", level=messages.SUCCESS)
 
 	def reject_requests(self, request, queryset):
-		count = 0
-		for req in queryset.filter(status="pending"):
-			req.status = "rejected"
-			req.reviewed_at = timezone.now()
-			req.save()
-			count += 1
+		count = reject_premium_requests(queryset)
 		self.message_user(request, f"Rejected {count} request(s).", level=messages.WARNING)
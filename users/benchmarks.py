@@ -0,0 +1,186 @@
+"""Synthetic data and timing helpers for the ``benchmark_recommendations`` command.
+
+Everything here writes to whatever database is active; the command runs it
+against a throwaway test database.
+"""
+import csv
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .catalog_version import bump_catalog_version
+from .match_tokens import tokens_for
+from .models import Project, UserProfile
+from .project_import import ALL_COLUMNS, build_payload, read_rows
+from .query_metrics import percentile
+from .recommendation_service import invalidate_catalog_index
+from .search_service import rebuild_search_index
+
+
+DATA_DIR = Path(settings.BASE_DIR) / "data"
+
+
+class CatalogSample:
+    """Value distributions observed in the CSVs under ``data/``.
+
+    Stacks, goals, roles and tags are drawn per field, so generated rows keep
+    the correlations of the real catalog (AI projects get AI tags, ...).
+    """
+
+    def __init__(self, rows):
+        if not rows:
+            raise ValueError("No sample projects found.")
+        self.rows = rows
+        self.fields = Counter(row["field"] for row in rows)
+        self.plans = Counter(row["required_plan"] for row in rows)
+        self.skills = Counter(row["skill_level"] for row in rows)
+        self.by_field = {}
+        for row in rows:
+            pool = self.by_field.setdefault(row["field"], {"roles": [], "stacks": [], "goals": [], "tags": [], "rows": []})
+            pool["roles"].append(row["target_role"])
+            pool["stacks"].extend(item.strip() for item in row["tech_preference"].split(",") if item.strip())
+            pool["goals"].append(row["learning_goal"])
+            pool["tags"].extend(tag.strip() for tag in row["interest_tags"].split(",") if tag.strip())
+            pool["rows"].append(row)
+
+    @classmethod
+    def from_csv_dir(cls, data_dir=DATA_DIR):
+        rows = []
+        for path in sorted(Path(data_dir).glob("*.csv")):
+            with path.open("r", encoding="utf-8-sig", newline="") as f:
+                for row_index, row in read_rows(csv.DictReader(f)):
+                    try:
+                        rows.append(build_payload(row, row_index))
+                    except CommandError:
+                        continue
+        return cls(rows)
+
+    @staticmethod
+    def _weighted(rng, counter):
+        values = list(counter)
+        return rng.choices(values, weights=[counter[value] for value in values])[0]
+
+    def project_payload(self, rng, number):
+        field = self._weighted(rng, self.fields)
+        pool = self.by_field[field]
+        base = rng.choice(pool["rows"])
+        stack = rng.sample(pool["stacks"], min(len(pool["stacks"]), rng.randint(2, 4)))
+        tags = rng.sample(pool["tags"], min(len(pool["tags"]), rng.randint(2, 5)))
+        payload = dict(base)
+        payload.update(
+            {
+                "title": f"{base['title']} #{number}",
+                "target_role": rng.choice(pool["roles"]),
+                "skill_level": self._weighted(rng, self.skills),
+                "required_plan": self._weighted(rng, self.plans),
+                "tech_preference": ", ".join(dict.fromkeys(stack)),
+                "learning_goal": rng.choice(pool["goals"]),
+                "interest_tags": ",".join(dict.fromkeys(tags)),
+            }
+        )
+        return payload
+
+    def profile_fields(self, rng):
+        field = self._weighted(rng, self.fields)
+        pool = self.by_field[field]
+        return {
+            "field": field,
+            "target_role": rng.choice(pool["roles"]),
+            "skill_level": self._weighted(rng, self.skills),
+            "tech_preference": rng.choice(pool["stacks"]),
+            "learning_goal": rng.choice(pool["goals"]),
+            "interest_tags": ", ".join(dict.fromkeys(rng.sample(pool["tags"], min(len(pool["tags"]), 3)))),
+        }
+
+    def search_terms(self):
+        terms = set()
+        for field, pool in self.by_field.items():
+            terms.add(field.split()[0].lower())
+            terms.update(tag.lower() for tag in pool["tags"])
+        return sorted(terms)
+
+
+def grow_catalog(sample, size, rng, batch_size=2000):
+    """Add synthetic projects until the catalog has ``size`` rows."""
+    start = Project.objects.count()
+    batch = []
+    for number in range(start, size):
+        project = Project(**sample.project_payload(rng, number))
+        project.content_hash = project.compute_content_hash()
+        project.match_tokens = tokens_for(project)
+        batch.append(project)
+        if len(batch) >= batch_size:
+            Project.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Project.objects.bulk_create(batch)
+    rebuild_search_index()
+    invalidate_catalog_index()
+    bump_catalog_version()
+
+
+def create_profiles(sample, count, rng):
+    User.objects.bulk_create([User(username=f"bench-{index}") for index in range(count)])
+    users = list(User.objects.filter(username__startswith="bench-").order_by("id"))
+    profiles = []
+    for user in users:
+        profile = UserProfile(user=user, **sample.profile_fields(rng))
+        profile.match_tokens = tokens_for(profile)
+        profiles.append(profile)
+    UserProfile.objects.bulk_create(profiles)
+    return list(UserProfile.objects.select_related("user").order_by("id"))
+
+
+def write_import_file(sample, path, count, rng, offset):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=ALL_COLUMNS)
+        writer.writeheader()
+        for number in range(count):
+            payload = sample.project_payload(rng, offset + number)
+            payload["title"] = f"Imported {payload['title']}"
+            writer.writerow({col: payload[col] for col in ALL_COLUMNS})
+
+
+def measure(name, call, iterations, setup=None):
+    """Time ``call`` ``iterations`` times, then run it once more under tracemalloc.
+
+    ``setup`` (not timed) receives the iteration number and returns the
+    argument passed to ``call``.
+    """
+    timings = []
+    queries = 0
+    for iteration in range(iterations):
+        argument = setup(iteration) if setup else None
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            call(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries += len(captured)
+
+    argument = setup(iterations) if setup else None
+    tracemalloc.start()
+    try:
+        call(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "benchmark": name,
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3) if timings else 0.0,
+        "queries_per_call": round(queries / iterations, 2) if iterations else 0.0,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
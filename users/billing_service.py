@@ -0,0 +1,103 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Plan, PremiumRequest
+from .subscription_service import aget_active_subscription
+
+
+_plan_ids = None
+_plan_ids_loaded_at = 0.0
+_plan_ids_lock = threading.Lock()
+
+
+def _plan_ids_fresh():
+    timeout = getattr(settings, "PLAN_IDS_CACHE_TIMEOUT", 300)
+    return _plan_ids is not None and time.monotonic() - _plan_ids_loaded_at < timeout
+
+
+def get_plan_ids():
+    """Map lower-cased plan names to ids, cached per process.
+
+    Plan saves and deletes clear it in this process; other processes pick the
+    change up after ``PLAN_IDS_CACHE_TIMEOUT`` seconds.
+    """
+    global _plan_ids, _plan_ids_loaded_at
+    if _plan_ids_fresh():
+        return _plan_ids
+    with _plan_ids_lock:
+        if not _plan_ids_fresh():
+            plan_ids = {}
+            for plan_id, name in Plan.objects.order_by("-id").values_list("id", "name"):
+                # Lowest id wins, like Plan.objects.filter(name__iexact=...).first().
+                plan_ids[name.lower()] = plan_id
+            _plan_ids = plan_ids
+            _plan_ids_loaded_at = time.monotonic()
+        return _plan_ids
+
+
+async def aget_plan_ids():
+    if _plan_ids_fresh():
+        return _plan_ids
+    return await sync_to_async(get_plan_ids)()
+
+
+def invalidate_plan_ids():
+    global _plan_ids
+    _plan_ids = None
+
+
+@dataclass(slots=True)
+class BillingState:
+    active_subscription: object = None
+    premium_request: object = None
+    pending_request: object = None
+    approved_request: object = None
+
+    @property
+    def active_plan_id(self):
+        subscription = self.active_subscription
+        if subscription and subscription.plan and subscription.plan.price > 0:
+            return subscription.plan_id
+        return None
+
+    @property
+    def pending_plan_id(self):
+        return self.pending_request.plan_id if self.pending_request else None
+
+    @property
+    def approved_plan_id(self):
+        return self.approved_request.plan_id if self.approved_request else None
+
+
+def _partition_premium_requests(active_subscription, premium_requests):
+    """Pick the latest, pending and latest approved request from one ``-requested_at`` ordered fetch."""
+    state = BillingState(active_subscription=active_subscription)
+    approved = []
+    for premium_request in premium_requests:
+        if state.premium_request is None:
+            state.premium_request = premium_request
+        if premium_request.status == "pending" and state.pending_request is None:
+            state.pending_request = premium_request
+        elif premium_request.status == "approved":
+            approved.append(premium_request)
+    if approved:
+        # Same order as order_by("-reviewed_at", "-id") on SQLite: unreviewed rows last.
+        state.approved_request = max(approved, key=lambda req: (req.reviewed_at is not None, req.reviewed_at or 0, req.id))
+    return state
+
+
+def _premium_requests(user):
+    return PremiumRequest.objects.filter(user=user).order_by("-requested_at", "-id")
+
+
+async def aload_billing_state(user):
+    """Subscription and premium request state for ``user`` in two queries."""
+    # The async ORM runs queries one at a time on the thread-sensitive
+    # executor, so gathering these would not overlap them.
+    active_subscription = await aget_active_subscription(user)
+    premium_requests = [premium_request async for premium_request in _premium_requests(user)]
+    return _partition_premium_requests(active_subscription, premium_requests)
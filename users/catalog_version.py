@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import CatalogVersion
+
+
+CATALOG_VERSION_CACHE_KEY = "users:catalog_version"
+
+
+def read_catalog_version():
+    return CatalogVersion.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+
+def cache_catalog_version(version):
+    # Bumps only clear this process's copy unless CACHES is shared, so other
+    # workers re-read the table after CATALOG_VERSION_CACHE_TIMEOUT seconds.
+    cache.set(CATALOG_VERSION_CACHE_KEY, version, getattr(settings, "CATALOG_VERSION_CACHE_TIMEOUT", 10))
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        version = read_catalog_version()
+        cache_catalog_version(version)
+    return version
+
+
+def bump_catalog_version():
+    updated = CatalogVersion.objects.filter(pk=1).update(version=F("version") + 1)
+    if not updated:
+        catalog_version, created = CatalogVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+        if not created:
+            CatalogVersion.objects.filter(pk=1).update(version=F("version") + 1)
+    cache.delete(CATALOG_VERSION_CACHE_KEY)
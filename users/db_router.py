@@ -0,0 +1,67 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.db import connections
+
+
+REPLICA_ALIAS = "replica"
+
+# Catalog data that may lag behind the primary for a moment. Sessions,
+# subscriptions, usage counters and saved projects always use the primary.
+REPLICA_MODELS = frozenset({"project", "plan"})
+
+_use_replica = ContextVar("users_use_read_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.databases
+
+
+class ReadReplicaRouter:
+    """Send catalog reads made inside ``read_replica`` views to the replica."""
+
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and model._meta.app_label == "users"
+            and model._meta.model_name in REPLICA_MODELS
+            and replica_configured()
+        ):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Never fall back to the alias an instance was read from.
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA_ALIAS else None
+
+
+def read_replica(view_func):
+    """Let ``view_func`` read catalog models from the replica, if configured."""
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def async_wrapped(request, *args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+
+        return async_wrapped
+
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    return wrapped
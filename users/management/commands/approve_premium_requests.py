@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import PremiumRequest
+from users.premium_request_service import approve_premium_requests, get_fallback_plan
+
+
+class Command(BaseCommand):
+    help = "Approve pending premium requests, oldest first, one transaction per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Requests approved per transaction (default: 500).")
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Approve at most this many requests (default: all pending).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many requests would be approved.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        limit = options["limit"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if limit < 0:
+            raise CommandError("--limit must not be negative.")
+
+        pending = PremiumRequest.objects.filter(status="pending")
+        if options["dry_run"]:
+            count = pending.count()
+            self.stdout.write(self.style.NOTICE(f"DRY RUN summary | pending={min(count, limit) if limit else count}"))
+            return
+
+        fallback_plan = get_fallback_plan()
+        if not fallback_plan:
+            raise CommandError("Create a paid plan first (e.g., Pro Monthly).")
+
+        approved_count = 0
+        batches = 0
+        while not limit or approved_count < limit:
+            size = min(batch_size, limit - approved_count) if limit else batch_size
+            ids = list(pending.order_by("requested_at", "id").values_list("id", flat=True)[:size])
+            if not ids:
+                break
+            approved_count += approve_premium_requests(PremiumRequest.objects.filter(id__in=ids), fallback_plan)
+            batches += 1
+
+        self.stdout.write(self.style.NOTICE(f"APPROVE summary | approved={approved_count} batches={batches}"))
@@ -0,0 +1,184 @@
+import io
+import json
+import platform
+import random
+import tempfile
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from users.benchmarks import CatalogSample, create_profiles, grow_catalog, measure, write_import_file
+from users.models import Plan, Project, Subscription
+from users.recommendation_service import get_catalog_index, invalidate_catalog_index, recommend_projects_for_profile
+
+
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "users-benchmark",
+    }
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark recommendations, catalog search, the project library and the importer "
+        "on synthetic catalogs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,100000",
+            help="Comma separated catalog sizes (default: 1000,10000,100000).",
+        )
+        parser.add_argument("--profiles", type=int, default=200, help="Synthetic user profiles (default: 200).")
+        parser.add_argument("--iterations", type=int, default=50, help="Timed calls per benchmark (default: 50).")
+        parser.add_argument("--import-rows", type=int, default=500, help="Rows per import run (default: 500).")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the generators (default: 42).")
+        parser.add_argument("--output", default="", help="Write the JSON report to this path ('-' for stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options["sizes"].split(",") if size.strip()})
+        except ValueError as exc:
+            raise CommandError("--sizes must be comma separated integers.") from exc
+        if not sizes or sizes[0] < 1:
+            raise CommandError("--sizes must list at least one positive size.")
+        for name in ("profiles", "iterations", "import_rows"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        try:
+            # Isolated cache and no page caching: measure the views, not cache hits,
+            # and never touch entries of the real deployment.
+            with override_settings(CACHES=BENCHMARK_CACHES, PAGE_CACHE_TIMEOUT=0):
+                results = self._run(sizes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "recommendation_engine": getattr(settings, "RECOMMENDATION_ENGINE", "python"),
+                "sizes": sizes,
+                "profiles": options["profiles"],
+                "iterations": options["iterations"],
+                "import_rows": options["import_rows"],
+                "seed": options["seed"],
+            },
+            "results": results,
+        }
+
+        output = options["output"]
+        if output == "-":
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if output:
+            Path(output).expanduser().write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+        self.stdout.write("-" * 72)
+        for row in results:
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"BENCHMARK {row['benchmark']} | size={row['size']} p50={row['p50_ms']}ms "
+                    f"p95={row['p95_ms']}ms p99={row['p99_ms']}ms queries={row['queries_per_call']} "
+                    f"peak_kb={row['peak_memory_kb']}"
+                )
+            )
+        if output:
+            self.stdout.write(f"JSON report written to {output}")
+
+    def _run(self, sizes, options):
+        rng = random.Random(options["seed"])
+        iterations = options["iterations"]
+        sample = CatalogSample.from_csv_dir()
+        terms = sample.search_terms()
+
+        profiles = create_profiles(sample, options["profiles"], rng)
+        plan, _ = Plan.objects.get_or_create(name="Pro Yearly", defaults={"price": 1})
+        premium_user = profiles[0].user
+        Subscription.objects.create(user=premium_user, plan=plan, end_date=timezone.now().date() + timezone.timedelta(days=365))
+        tiers = ["pro_yearly" if profile.user_id == premium_user.pk else "explorer" for profile in profiles]
+
+        explorer_client = Client()
+        explorer_client.force_login(profiles[-1].user)
+        premium_client = Client()
+        premium_client.force_login(premium_user)
+
+        def get(client, url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}.")
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for size in sizes:
+                self.stdout.write(f"Building a catalog of {size} projects...")
+                grow_catalog(sample, size, rng)
+
+                def rebuild_index(_):
+                    invalidate_catalog_index()
+                    get_catalog_index()
+
+                def recommend(index):
+                    profile = profiles[index % len(profiles)]
+                    recommend_projects_for_profile(profile, 6, tiers[index % len(profiles)])
+
+                benchmarks = [
+                    measure("catalog_index_build", rebuild_index, min(iterations, 5)),
+                    measure("recommend_projects_for_profile", recommend, iterations, setup=lambda i: i),
+                    measure(
+                        "projects_view_search",
+                        lambda term: get(explorer_client, f"/projects/?{urlencode({'q': term})}"),
+                        iterations,
+                        setup=lambda i: rng.choice(terms),
+                    ),
+                    measure(
+                        "projects_view_search_premium",
+                        lambda term: get(premium_client, f"/projects/?{urlencode({'q': term})}"),
+                        iterations,
+                        setup=lambda i: rng.choice(terms),
+                    ),
+                    measure("project_library_view", lambda _: get(explorer_client, "/project-library/"), iterations),
+                    measure("project_library_view_premium", lambda _: get(premium_client, "/project-library/"), iterations),
+                ]
+
+                import_runs = min(iterations, 3)
+
+                def write_file(run):
+                    path = Path(tmp_dir) / f"import-{size}-{run}.csv"
+                    write_import_file(sample, path, options["import_rows"], rng, offset=size + run * options["import_rows"])
+                    return path
+
+                def run_import(path):
+                    call_command(
+                        "import_projects_csv",
+                        str(path),
+                        bulk=True,
+                        update_existing=True,
+                        stdout=io.StringIO(),
+                        stderr=io.StringIO(),
+                    )
+
+                benchmarks.append(measure("import_projects_csv_bulk", run_import, import_runs, setup=write_file))
+                # Keep the catalog at ``size`` rows for the next, larger run.
+                Project.objects.filter(title__startswith="Imported ").delete()
+
+                results.extend({"size": size, **row} for row in benchmarks)
+
+        return results
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import Subscription
+
+
+class Command(BaseCommand):
+    help = "Deactivate subscriptions whose end_date has passed, in small batches. Run once a day."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows updated per transaction (default: 500).")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many subscriptions would be deactivated.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        today = timezone.now().date()
+        expired = Subscription.objects.filter(is_active=True, end_date__lt=today)
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.NOTICE(f"DRY RUN summary | expired={expired.count()}"))
+            return
+
+        expired_count = 0
+        batches = 0
+        while True:
+            # end_date order walks the partial index on active rows instead of the table.
+            ids = list(expired.order_by("end_date", "id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            # Short transactions keep the SQLite write lock only briefly.
+            with transaction.atomic():
+                expired_count += Subscription.objects.filter(id__in=ids, is_active=True).update(is_active=False)
+            batches += 1
+
+        self.stdout.write(self.style.NOTICE(f"EXPIRE summary | expired={expired_count} batches={batches}"))
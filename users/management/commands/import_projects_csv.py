@@ -1,57 +1,109 @@
-import csv
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from users.match_tokens import tokens_for
 from users.models import Project
+from users.project_import import (
+    ALL_COLUMNS,
+    MATCH_COLUMNS,
+    RejectedRowsWriter,
+    content_hash,
+    match_key,
+    open_rows,
+    validate_rows,
+)
+from users.search_service import index_projects, rebuild_search_index
+from users.signals import catalog_changed, deferred_catalog_changes
 
 
-SKILL_LEVEL_NORMALIZATION = {
-    "beginner": "beginner",
-    "intermediate": "intermediate",
-    "advanced": "advanced",
-}
-
-PLAN_NORMALIZATION = {
-    "explorer": "explorer",
-    "free": "explorer",
-    "pro_monthly": "pro_monthly",
-    "pro monthly": "pro_monthly",
-    "monthly": "pro_monthly",
-    "pro_yearly": "pro_yearly",
-    "pro yearly": "pro_yearly",
-    "yearly": "pro_yearly",
-    "annual": "pro_yearly",
-}
-
-REQUIRED_COLUMNS = [
-    "title",
-    "description",
-    "field",
-    "target_role",
-    "skill_level",
-    "required_plan",
-    "tech_preference",
-    "learning_goal",
-    "interest_tags",
-]
-
-OPTIONAL_COLUMNS = [
-    "learning_objectives",
-    "resources",
-    "task_checklist",
-    "detailed_roadmap",
-    "premium_hints",
-]
-
-ALL_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+class BulkProjectWriter:
+    """Buffer creates and updates and write them with one transaction per batch.
+
+    Every existing title+field+target_role key and content hash is loaded up
+    front, so rows are matched and diffed without a query each. Bulk writes skip
+    model signals and ``Project.save()``, so the derived columns are filled in
+    here, and each written batch is re-indexed for search. Callers must
+    refresh the catalog caches once the import is done.
+    """
+
+    def __init__(self, batch_size, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.existing = {}
+        self.hashes = {}
+        rows = Project.objects.order_by("-id").values_list("id", "content_hash", *MATCH_COLUMNS)
+        for project_id, digest, *key in rows.iterator(chunk_size=2000):
+            # Keep the lowest id, like Project.objects.filter(...).first().
+            self.existing[tuple(key)] = project_id
+            self.hashes[tuple(key)] = digest
+        self.pending_creates = {}
+        self.pending_updates = {}
+        self.written = False
+
+    def exists(self, key):
+        return key in self.existing or key in self.pending_creates
+
+    def content_hash(self, key):
+        return self.hashes.get(key)
+
+    def create(self, key, payload):
+        self.pending_creates[key] = self._project(key, payload)
+        self._maybe_flush()
+
+    def update(self, key, payload):
+        if key in self.pending_creates:
+            self.pending_creates[key] = self._project(key, payload)
+        else:
+            self.pending_updates[key] = self._project(key, payload, id=self.existing[key])
+        self._maybe_flush()
+
+    def _project(self, key, payload, **extra):
+        digest = content_hash(payload)
+        self.hashes[key] = digest
+        project = Project(**payload, content_hash=digest, **extra)
+        project.match_tokens = tokens_for(project)
+        return project
+
+    def _maybe_flush(self):
+        if len(self.pending_creates) + len(self.pending_updates) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        creates = list(self.pending_creates.items())
+        updates = list(self.pending_updates.values())
+        self.pending_creates = {}
+        self.pending_updates = {}
+        if self.dry_run:
+            for key, _ in creates:
+                self.existing.setdefault(key, None)
+            return
+        if not creates and not updates:
+            return
+
+        with transaction.atomic():
+            if creates:
+                Project.objects.bulk_create([project for _, project in creates], batch_size=self.batch_size)
+            if updates:
+                Project.objects.bulk_update(updates, ALL_COLUMNS + ["content_hash", "match_tokens"], batch_size=self.batch_size)
+        self.written = True
+
+        for key, project in creates:
+            if project.pk is None:
+                project.pk = Project.objects.filter(**dict(zip(MATCH_COLUMNS, key))).values_list("id", flat=True).first()
+            self.existing.setdefault(key, project.pk)
+        index_projects([project for _, project in creates] + updates)
 
 
 class Command(BaseCommand):
-    help = "Import projects from a CSV file (create new or update existing by title+field+target_role)."
+    help = (
+        "Import projects from a CSV or JSON Lines file, optionally gzip-compressed "
+        "(create new or update existing by title+field+target_role)."
+    )
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_path", type=str, help="Path to CSV file")
+        parser.add_argument("csv_path", type=str, help="Path to a .csv, .csv.gz, .jsonl or .jsonl.gz file")
         parser.add_argument(
             "--update-existing",
             action="store_true",
@@ -62,122 +114,175 @@ class Command(BaseCommand):
             action="store_true",
             help="Validate and preview import without writing to database.",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Match rows against one prefetch of existing projects and write with bulk_create/bulk_update.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows written per transaction in --bulk mode (default: 500).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes used to validate rows (default: 1, validate inline).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Rows per validation chunk (default: 1000).",
+        )
+        parser.add_argument(
+            "--error-csv",
+            type=str,
+            default="",
+            help="Where to write rejected rows (default: <csv_path>.errors.csv, only created on errors).",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete projects whose title+field+target_role is not in the CSV (skipped if any row is rejected).",
+        )
 
     def handle(self, *args, **options):
         csv_path = Path(options["csv_path"]).expanduser().resolve()
         update_existing = options["update_existing"]
         dry_run = options["dry_run"]
+        bulk = options["bulk"]
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        chunk_size = options["chunk_size"]
+        prune = options["prune"]
+        self.verbosity = options["verbosity"]
 
         if not csv_path.exists() or not csv_path.is_file():
-            raise CommandError(f"CSV file not found: {csv_path}")
+            raise CommandError(f"Input file not found: {csv_path}")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if workers < 1 or chunk_size < 1:
+            raise CommandError("--workers and --chunk-size must be at least 1.")
 
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-        error_count = 0
+        error_csv = Path(options["error_csv"] or f"{csv_path}.errors.csv").expanduser().resolve()
+        writer = BulkProjectWriter(batch_size, dry_run=dry_run) if bulk else None
 
-        with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.DictReader(f)
+        self.counts = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "pruned": 0, "errors": 0}
+        # Only --prune needs every key of the file in memory.
+        self.seen_keys = set() if prune else None
 
-            if not reader.fieldnames:
-                raise CommandError("CSV has no header row.")
+        # Row-by-row saves and prune deletes each report a catalog change;
+        # apply them once, after the import.
+        with deferred_catalog_changes():
+            with open_rows(csv_path) as (fieldnames, rows):
+                rejected = RejectedRowsWriter(error_csv, fieldnames)
+                try:
+                    validated = validate_rows(rows, workers=workers, chunk_size=chunk_size)
+                    accepted = self._reject_invalid(validated, rejected)
+                    actions = self._dedupe(accepted, writer, update_existing)
+                    self._write(actions, writer, dry_run)
+                finally:
+                    rejected.close()
 
-            missing = [col for col in REQUIRED_COLUMNS if col not in reader.fieldnames]
-            if missing:
-                raise CommandError(f"Missing required columns: {', '.join(missing)}")
+            if writer:
+                writer.flush()
 
-            for row_index, raw_row in enumerate(reader, start=2):
-                row = {k: (v.strip() if isinstance(v, str) else v) for k, v in raw_row.items()}
+            if prune:
+                if self.counts["errors"]:
+                    self.stdout.write(self.style.WARNING("Skipped --prune because some rows were rejected."))
+                else:
+                    self._prune(dry_run)
 
-                try:
-                    payload = self._build_payload(row, row_index)
-                except CommandError as exc:
-                    self.stderr.write(self.style.ERROR(str(exc)))
-                    error_count += 1
-                    continue
-
-                lookup = {
-                    "title": payload["title"],
-                    "field": payload["field"],
-                    "target_role": payload["target_role"],
-                }
-                existing = Project.objects.filter(**lookup).first()
-
-                if existing:
-                    if not update_existing:
-                        skipped_count += 1
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f"Row {row_index}: skipped existing project '{payload['title']}' "
-                                "(use --update-existing to update)."
-                            )
-                        )
-                        continue
-
-                    updated_count += 1
-                    if not dry_run:
-                        for key, value in payload.items():
-                            setattr(existing, key, value)
-                        existing.save()
-                    self.stdout.write(self.style.SUCCESS(f"Row {row_index}: updated '{payload['title']}'"))
-                    continue
-
-                created_count += 1
-                if not dry_run:
-                    Project.objects.create(**payload)
-                self.stdout.write(self.style.SUCCESS(f"Row {row_index}: created '{payload['title']}'"))
+            if self.counts["pruned"] and not dry_run:
+                rebuild_search_index()
+            if writer and writer.written:
+                # Bulk writes skip the model signals.
+                catalog_changed()
 
         mode = "DRY RUN" if dry_run else "IMPORT"
         self.stdout.write("-" * 72)
         self.stdout.write(
             self.style.NOTICE(
-                f"{mode} summary | created={created_count} updated={updated_count} "
-                f"skipped={skipped_count} errors={error_count}"
+                f"{mode} summary | created={self.counts['created']} updated={self.counts['updated']} "
+                f"unchanged={self.counts['unchanged']} skipped={self.counts['skipped']} "
+                f"pruned={self.counts['pruned']} errors={self.counts['errors']}"
             )
         )
 
-        if error_count:
+        if rejected.count:
+            self.stdout.write(self.style.WARNING(f"Rejected rows written to {error_csv}"))
+        if self.counts["errors"]:
             raise CommandError("Import finished with errors. Fix rows and run again.")
 
-    def _build_payload(self, row, row_index):
-        for col in REQUIRED_COLUMNS:
-            if not row.get(col):
-                raise CommandError(f"Row {row_index}: '{col}' is required.")
-
-        skill_level = self._normalize_skill_level(row["skill_level"], row_index)
-        required_plan = self._normalize_plan(row["required_plan"], row_index)
-
-        payload = {
-            "title": row["title"],
-            "description": row["description"],
-            "field": row["field"],
-            "target_role": row["target_role"],
-            "skill_level": skill_level,
-            "required_plan": required_plan,
-            "tech_preference": row["tech_preference"],
-            "learning_goal": row["learning_goal"],
-            "interest_tags": row["interest_tags"],
-            "learning_objectives": row.get("learning_objectives", ""),
-            "resources": row.get("resources", ""),
-            "task_checklist": row.get("task_checklist", ""),
-            "detailed_roadmap": row.get("detailed_roadmap", ""),
-            "premium_hints": row.get("premium_hints", ""),
-        }
-
-        return payload
-
-    def _normalize_skill_level(self, value, row_index):
-        key = str(value).strip().lower()
-        normalized = SKILL_LEVEL_NORMALIZATION.get(key)
-        if not normalized:
-            valid = ", ".join(SKILL_LEVEL_NORMALIZATION.keys())
-            raise CommandError(f"Row {row_index}: invalid skill_level '{value}'. Valid: {valid}")
-        return normalized
-
-    def _normalize_plan(self, value, row_index):
-        key = str(value).strip().lower()
-        normalized = PLAN_NORMALIZATION.get(key)
-        if not normalized:
-            valid = ", ".join(sorted(PLAN_NORMALIZATION.keys()))
-            raise CommandError(f"Row {row_index}: invalid required_plan '{value}'. Valid: {valid}")
-        return normalized
+    def _reject_invalid(self, validated, rejected):
+        for row_index, row, payload, error in validated:
+            if error:
+                self.stderr.write(self.style.ERROR(error))
+                rejected.write(row_index, row, error)
+                self.counts["errors"] += 1
+                continue
+            yield row_index, payload
+
+    def _dedupe(self, accepted, writer, update_existing):
+        for row_index, payload in accepted:
+            key = match_key(payload)
+            if self.seen_keys is not None:
+                self.seen_keys.add(key)
+            if writer:
+                existing = writer.exists(key)
+                stored_hash = writer.content_hash(key) if existing else None
+            else:
+                existing = Project.objects.filter(**{col: payload[col] for col in MATCH_COLUMNS}).first()
+                stored_hash = existing.content_hash if existing else None
+
+            if not existing:
+                yield "create", row_index, payload, None
+            elif update_existing and stored_hash == content_hash(payload):
+                self.counts["unchanged"] += 1
+                if self.verbosity > 1:
+                    self.stdout.write(f"Row {row_index}: unchanged '{payload['title']}'")
+            elif update_existing:
+                yield "update", row_index, payload, existing
+            else:
+                self.counts["skipped"] += 1
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Row {row_index}: skipped existing project '{payload['title']}' "
+                        "(use --update-existing to update)."
+                    )
+                )
+
+    def _write(self, actions, writer, dry_run):
+        for action, row_index, payload, existing in actions:
+            if action == "update":
+                self.counts["updated"] += 1
+                if writer:
+                    writer.update(match_key(payload), payload)
+                elif not dry_run:
+                    for key, value in payload.items():
+                        setattr(existing, key, value)
+                    existing.save()
+                self.stdout.write(self.style.SUCCESS(f"Row {row_index}: updated '{payload['title']}'"))
+                continue
+
+            self.counts["created"] += 1
+            if writer:
+                writer.create(match_key(payload), payload)
+            elif not dry_run:
+                Project.objects.create(**payload)
+            self.stdout.write(self.style.SUCCESS(f"Row {row_index}: created '{payload['title']}'"))
+
+    def _prune(self, dry_run):
+        stale_ids = [
+            project_id
+            for project_id, *key in Project.objects.order_by().values_list("id", *MATCH_COLUMNS).iterator(chunk_size=2000)
+            if tuple(key) not in self.seen_keys
+        ]
+        self.counts["pruned"] = len(stale_ids)
+        if dry_run or not stale_ids:
+            return
+        for start in range(0, len(stale_ids), 500):
+            Project.objects.filter(id__in=stale_ids[start:start + 500]).delete()
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import UserProfile
+from users.recommendation_batch import precompute_recommendations
+
+
+class Command(BaseCommand):
+    help = "Precompute and store the top recommendations for every user profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=6, help="Recommendations stored per user (default: 6).")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Profiles scored per chunk (default: 500).")
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes used for scoring (default: 1).")
+        parser.add_argument("--user", action="append", dest="usernames", help="Only precompute for this username (repeatable).")
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+
+        if limit < 1:
+            raise CommandError("--limit must be at least 1.")
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        profiles = UserProfile.objects.all()
+        if options["usernames"]:
+            profiles = profiles.filter(user__username__in=options["usernames"])
+
+        def report(done, total):
+            self.stdout.write(f"{done}/{total} profile(s) written")
+
+        started = time.perf_counter()
+        written = precompute_recommendations(
+            profiles,
+            limit=limit,
+            chunk_size=chunk_size,
+            workers=workers,
+            on_chunk=report if options["verbosity"] > 1 else None,
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write("-" * 72)
+        self.stdout.write(
+            self.style.NOTICE(f"PRECOMPUTE summary | profiles={written} workers={workers} seconds={elapsed:.2f}")
+        )
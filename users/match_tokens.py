@@ -0,0 +1,33 @@
+"""Normalized matching tokens stored next to the raw profile/project text.
+
+``Project.match_tokens`` and ``UserProfile.match_tokens`` hold the output of
+``build_match_tokens`` so recommendation scoring and card rendering do not
+re-split the comma separated columns on every request.
+"""
+
+
+def normalize(value):
+    return str(value or "").strip().lower()
+
+
+def split_csv(value):
+    return [item.strip() for item in str(value or "").split(",") if item.strip()]
+
+
+def split_tags(value):
+    return {tag.lower() for tag in split_csv(value)}
+
+
+def build_match_tokens(field, tech_preference, learning_goal, interest_tags):
+    return {
+        "field": normalize(field),
+        "tech": normalize(tech_preference),
+        "goal": normalize(learning_goal),
+        "tags": sorted(split_tags(interest_tags)),
+        "stack": split_csv(tech_preference),
+        "labels": split_csv(interest_tags),
+    }
+
+
+def tokens_for(instance):
+    return build_match_tokens(instance.field, instance.tech_preference, instance.learning_goal, instance.interest_tags)
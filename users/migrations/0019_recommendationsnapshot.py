@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0018_remove_userprofile_learning_style"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecommendationSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "plan_tier",
+                    models.CharField(
+                        choices=[("explorer", "Explorer (Free)"), ("pro_monthly", "Pro Monthly"), ("pro_yearly", "Pro Yearly")],
+                        default="explorer",
+                        max_length=20,
+                    ),
+                ),
+                ("items", models.JSONField(blank=True, default=list)),
+                ("computed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ["-computed_at", "-id"],
+            },
+        ),
+    ]
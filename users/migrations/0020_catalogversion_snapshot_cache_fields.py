@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+def create_catalog_version(apps, schema_editor):
+    CatalogVersion = apps.get_model("users", "CatalogVersion")
+    CatalogVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0019_recommendationsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="recommendationsnapshot",
+            name="cache_key",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="recommendationsnapshot",
+            name="catalog_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="recommendationsnapshot",
+            name="result_limit",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(create_catalog_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0020_catalogversion_snapshot_cache_fields"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedProject",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(help_text="Workspace id used in URLs, e.g. 'catalog-12' or 'rec-0'.", max_length=40)),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[("catalog", "Catalog"), ("recommendation", "Recommendation"), ("showcase", "Showcase")],
+                        default="recommendation",
+                        max_length=20,
+                    ),
+                ),
+                ("recommendation_index", models.PositiveIntegerField(blank=True, null=True)),
+                ("title", models.CharField(blank=True, max_length=140)),
+                ("category", models.CharField(blank=True, max_length=100)),
+                ("difficulty", models.CharField(blank=True, max_length=20)),
+                ("summary", models.TextField(blank=True)),
+                ("phases", models.JSONField(blank=True, default=list)),
+                ("total_tasks", models.PositiveIntegerField(default=0)),
+                ("completed_tasks", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="users.project"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_projects",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["created_at", "id"],
+                "indexes": [models.Index(fields=["user", "created_at", "id"], name="users_saved_user_created_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="savedproject",
+            constraint=models.UniqueConstraint(fields=("user", "key"), name="users_unique_saved_project_key"),
+        ),
+        migrations.CreateModel(
+            name="TaskProgress",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("task_id", models.PositiveIntegerField()),
+                ("completed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "saved_project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_progress",
+                        to="users.savedproject",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["saved_project", "task_id"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="taskprogress",
+            constraint=models.UniqueConstraint(fields=("saved_project", "task_id"), name="users_unique_task_progress"),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import OperationalError, migrations
+
+
+FTS_COLUMNS = "title, description, field, target_role, tech_preference, interest_tags"
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS users_project_fts USING fts5("
+                f"{FTS_COLUMNS}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to the ORM filter.
+            return
+        cursor.execute(
+            f"INSERT INTO users_project_fts (rowid, {FTS_COLUMNS}) SELECT id, {FTS_COLUMNS} FROM users_project"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS users_project_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0021_savedproject_taskprogress"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
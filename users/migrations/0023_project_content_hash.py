@@ -0,0 +1,52 @@
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+CONTENT_COLUMNS = [
+    "title",
+    "description",
+    "field",
+    "target_role",
+    "skill_level",
+    "required_plan",
+    "tech_preference",
+    "learning_goal",
+    "interest_tags",
+    "learning_objectives",
+    "resources",
+    "task_checklist",
+    "detailed_roadmap",
+    "premium_hints",
+]
+
+
+def backfill_content_hash(apps, schema_editor):
+    Project = apps.get_model("users", "Project")
+    batch = []
+    for project in Project.objects.order_by().only("id", *CONTENT_COLUMNS).iterator(chunk_size=2000):
+        values = [str(getattr(project, col) or "") for col in CONTENT_COLUMNS]
+        project.content_hash = hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+        batch.append(project)
+        if len(batch) >= 500:
+            Project.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    if batch:
+        Project.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0022_project_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="content_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
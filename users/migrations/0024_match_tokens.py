@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def _split_csv(value):
+    return [item.strip() for item in str(value or "").split(",") if item.strip()]
+
+
+def _tokens(instance):
+    return {
+        "field": str(instance.field or "").strip().lower(),
+        "tech": str(instance.tech_preference or "").strip().lower(),
+        "goal": str(instance.learning_goal or "").strip().lower(),
+        "tags": sorted({tag.lower() for tag in _split_csv(instance.interest_tags)}),
+        "stack": _split_csv(instance.tech_preference),
+        "labels": _split_csv(instance.interest_tags),
+    }
+
+
+def backfill_match_tokens(apps, schema_editor):
+    for model_name in ("Project", "UserProfile"):
+        model = apps.get_model("users", model_name)
+        batch = []
+        rows = model.objects.order_by().only("id", "field", "tech_preference", "learning_goal", "interest_tags")
+        for instance in rows.iterator(chunk_size=2000):
+            instance.match_tokens = _tokens(instance)
+            batch.append(instance)
+            if len(batch) >= 500:
+                model.objects.bulk_update(batch, ["match_tokens"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["match_tokens"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0023_project_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="match_tokens",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="match_tokens",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill_match_tokens, migrations.RunPython.noop),
+    ]
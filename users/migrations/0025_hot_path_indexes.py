@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0024_match_tokens"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["field", "title", "id"], name="users_proj_field_title_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["required_plan", "field", "title", "id"], name="users_proj_plan_field_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="subscription",
+            index=models.Index(fields=["user", "end_date"], condition=Q(is_active=True), name="users_sub_user_active_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="subscription",
+            index=models.Index(fields=["end_date"], condition=Q(is_active=True), name="users_sub_active_end_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="premiumrequest",
+            index=models.Index(fields=["user", "status", "reviewed_at"], name="users_preq_user_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="premiumrequest",
+            index=models.Index(fields=["user", "requested_at", "id"], name="users_preq_user_requested_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="premiumrequest",
+            index=models.Index(fields=["status", "requested_at", "id"], name="users_preq_status_idx"),
+        ),
+    ]
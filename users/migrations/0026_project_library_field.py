@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, NullIf, Trim
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0025_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="library_field",
+            field=models.GeneratedField(
+                expression=Coalesce(NullIf(Trim("field"), Value("")), Value("General")),
+                output_field=models.CharField(max_length=100),
+                db_persist=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["library_field", "title", "id"], name="users_proj_library_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["required_plan", "library_field", "title", "id"], name="users_proj_plan_library_idx"),
+        ),
+    ]
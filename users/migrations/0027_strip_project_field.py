@@ -0,0 +1,50 @@
+import hashlib
+import json
+
+from django.db import migrations
+
+
+CONTENT_COLUMNS = [
+    "title",
+    "description",
+    "field",
+    "target_role",
+    "skill_level",
+    "required_plan",
+    "tech_preference",
+    "learning_goal",
+    "interest_tags",
+    "learning_objectives",
+    "resources",
+    "task_checklist",
+    "detailed_roadmap",
+    "premium_hints",
+]
+
+
+def strip_fields(apps, schema_editor):
+    Project = apps.get_model("users", "Project")
+    batch = []
+    for project in Project.objects.order_by().only("id", *CONTENT_COLUMNS).iterator(chunk_size=2000):
+        if project.field == project.field.strip():
+            continue
+        project.field = project.field.strip()
+        values = [str(getattr(project, col) or "") for col in CONTENT_COLUMNS]
+        project.content_hash = hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+        batch.append(project)
+        if len(batch) >= 500:
+            Project.objects.bulk_update(batch, ["field", "content_hash"])
+            batch = []
+    if batch:
+        Project.objects.bulk_update(batch, ["field", "content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0026_project_library_field"),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_fields, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce, NullIf, Trim
 from django.utils import timezone
 
+from .match_tokens import tokens_for
+from .project_import import ALL_COLUMNS as PROJECT_CONTENT_COLUMNS, content_hash
+
 
 class UserProfile(models.Model):
     objects = None
@@ -21,10 +25,18 @@ class UserProfile(models.Model):
     learning_goal = models.CharField(max_length=100)
     interest_tags = models.CharField(max_length=200, help_text="Comma separated tags")
     profile_picture = models.FileField(upload_to="profile_pictures/", blank=True, null=True)
+    match_tokens = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.user.username} Profile"
 
+    def save(self, *args, **kwargs):
+        self.match_tokens = tokens_for(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "match_tokens"}
+        super().save(*args, **kwargs)
+
 
 class Plan(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -48,12 +60,16 @@ class Subscription(models.Model):
 
     class Meta:
         ordering = ["-start_date", "-id"]
+        indexes = [
+            models.Index(fields=["user", "end_date"], condition=Q(is_active=True), name="users_sub_user_active_idx"),
+            models.Index(fields=["end_date"], condition=Q(is_active=True), name="users_sub_active_end_idx"),
+        ]
 
     def clean(self):
         if self.end_date and self.start_date and self.end_date < self.start_date:
             raise ValidationError("End date must be after start date.")
         if self.is_active:
-            qs = Subscription.objects.filter(user=self.user, is_active=True)
+            qs = Subscription.objects.filter(user=self.user, is_active=True, end_date__gte=timezone.now().date())
             if self.pk:
                 qs = qs.exclude(pk=self.pk)
             if qs.exists():
@@ -85,6 +101,11 @@ class PremiumRequest(models.Model):
 
     class Meta:
         ordering = ["-requested_at", "-id"]
+        indexes = [
+            models.Index(fields=["user", "status", "reviewed_at"], name="users_preq_user_status_idx"),
+            models.Index(fields=["user", "requested_at", "id"], name="users_preq_user_requested_idx"),
+            models.Index(fields=["status", "requested_at", "id"], name="users_preq_status_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user"],
@@ -135,6 +156,12 @@ class Project(models.Model):
     title = models.CharField(max_length=140)
     description = models.TextField()
     field = models.CharField(max_length=100)
+    # Library section: the trimmed field, or "General" when it is blank.
+    library_field = models.GeneratedField(
+        expression=Coalesce(NullIf(Trim("field"), Value("")), Value("General")),
+        output_field=models.CharField(max_length=100),
+        db_persist=True,
+    )
     target_role = models.CharField(max_length=100)
     skill_level = models.CharField(max_length=20, choices=SKILL_LEVEL_CHOICES)
     required_plan = models.CharField(max_length=20, choices=PLAN_ACCESS_CHOICES, default="explorer")
@@ -146,9 +173,107 @@ class Project(models.Model):
     task_checklist = models.TextField(blank=True, help_text="Checklist tasks, one per line.")
     detailed_roadmap = models.TextField(blank=True)
     premium_hints = models.TextField(blank=True, help_text="Premium hints, one per line.")
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    match_tokens = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["title", "id"]
+        indexes = [
+            models.Index(fields=["field", "title", "id"], name="users_proj_field_title_idx"),
+            models.Index(fields=["required_plan", "field", "title", "id"], name="users_proj_plan_field_idx"),
+            models.Index(fields=["library_field", "title", "id"], name="users_proj_library_idx"),
+            models.Index(fields=["required_plan", "library_field", "title", "id"], name="users_proj_plan_library_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def compute_content_hash(self):
+        return content_hash({col: getattr(self, col) for col in PROJECT_CONTENT_COLUMNS})
+
+    def save(self, *args, **kwargs):
+        # library_field only trims spaces; strip tabs and newlines here, as the
+        # importer does, so every view groups the project under the same name.
+        self.field = self.field.strip()
+        self.content_hash = self.compute_content_hash()
+        self.match_tokens = tokens_for(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash", "match_tokens"}
+        super().save(*args, **kwargs)
+
+
+class CatalogVersion(models.Model):
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+
+class RecommendationSnapshot(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    plan_tier = models.CharField(max_length=20, choices=Project.PLAN_ACCESS_CHOICES, default="explorer")
+    items = models.JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField(default=timezone.now)
+    cache_key = models.CharField(max_length=64, blank=True)
+    catalog_version = models.PositiveBigIntegerField(default=0)
+    result_limit = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-computed_at", "-id"]
+
+    def __str__(self):
+        return f"{self.user} - {len(self.items)} recommendation(s)"
+
+
+class SavedProject(models.Model):
+    SOURCE_CHOICES = [
+        ("catalog", "Catalog"),
+        ("recommendation", "Recommendation"),
+        ("showcase", "Showcase"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="saved_projects")
+    key = models.CharField(max_length=40, help_text="Workspace id used in URLs, e.g. 'catalog-12' or 'rec-0'.")
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default="recommendation")
+    project = models.ForeignKey(Project, on_delete=models.SET_NULL, blank=True, null=True)
+    recommendation_index = models.PositiveIntegerField(blank=True, null=True)
+    title = models.CharField(max_length=140, blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    difficulty = models.CharField(max_length=20, blank=True)
+    summary = models.TextField(blank=True)
+    phases = models.JSONField(default=list, blank=True)
+    total_tasks = models.PositiveIntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="users_unique_saved_project_key")
+        ]
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="users_saved_user_created_idx"),
+        ]
+
+    @property
+    def progress_pct(self):
+        return int((self.completed_tasks / self.total_tasks) * 100) if self.total_tasks else 0
+
+    def __str__(self):
+        return f"{self.user} - {self.title}"
+
+
+class TaskProgress(models.Model):
+    saved_project = models.ForeignKey(SavedProject, on_delete=models.CASCADE, related_name="task_progress")
+    task_id = models.PositiveIntegerField()
+    completed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["saved_project", "task_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["saved_project", "task_id"], name="users_unique_task_progress")
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.saved_project} - task {self.task_id}"
@@ -0,0 +1,80 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+from .catalog_version import get_catalog_version
+
+
+def page_cache_timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 300)
+
+
+def anonymous_page_key(request, name, query_params=()):
+    params = urlencode([(param, request.GET.get(param, "").strip()) for param in query_params])
+    digest = hashlib.sha256(params.encode("utf-8")).hexdigest()[:32]
+    return f"users:page:{name}:explorer:{get_catalog_version()}:{digest}"
+
+
+def _is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # A rendered {% csrf_token %} is tied to this visitor's cookie.
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and not getattr(getattr(request, "session", None), "modified", False)
+    )
+
+
+def cache_anonymous_page(name, query_params=()):
+    """Serve whole responses from the cache for logged-out GET/HEAD requests.
+
+    Only ``query_params`` are part of the key, so unrelated query strings
+    cannot fill the cache. Keys include the catalog version, so a project
+    change is visible once the version has been bumped.
+    """
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def async_wrapped(request, *args, **kwargs):
+                timeout = page_cache_timeout()
+                if not timeout or request.method not in ("GET", "HEAD") or (await request.auser()).is_authenticated:
+                    return await view_func(request, *args, **kwargs)
+
+                key = await sync_to_async(anonymous_page_key)(request, name, query_params)
+                response = await cache.aget(key)
+                if response is not None:
+                    return response
+
+                response = await view_func(request, *args, **kwargs)
+                if _is_cacheable(request, response):
+                    await cache.aset(key, response, timeout)
+                return response
+
+            return async_wrapped
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            timeout = page_cache_timeout()
+            if not timeout or request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            key = anonymous_page_key(request, name, query_params)
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if _is_cacheable(request, response):
+                cache.set(key, response, timeout)
+            return response
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Plan, PremiumRequest, Subscription
+from .subscription_service import invalidate_subscription_tiers
+
+
+# Ids per IN (...) list, well below SQLite's bound-parameter limit.
+CHUNK_SIZE = 500
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def get_fallback_plan():
+    """Plan granted when a request names no paid plan, or ``None`` if none exists."""
+    return (
+        Plan.objects.filter(name__iexact="Pro Monthly").first()
+        or Plan.objects.filter(price__gt=0).order_by("price", "id").first()
+    )
+
+
+def subscription_duration_days(plan):
+    return 365 if plan.name.lower().strip() == "pro yearly" else 30
+
+
+def _tiers_changed(user_ids):
+    # Bulk writes skip the model signals that normally drop cached tiers.
+    invalidate_subscription_tiers(user_ids)
+    transaction.on_commit(lambda: invalidate_subscription_tiers(user_ids))
+
+
+def approve_premium_requests(queryset, fallback_plan):
+    """Approve the pending requests in ``queryset`` in one transaction.
+
+    Each user's active subscriptions are replaced by one for the requested
+    paid plan (``fallback_plan`` otherwise). Returns the number approved.
+    """
+    now = timezone.now()
+    today = now.date()
+    with transaction.atomic():
+        pending = list(queryset.filter(status="pending").select_related("plan").order_by())
+        if not pending:
+            return 0
+
+        user_ids = [req.user_id for req in pending]
+        for chunk in _chunks(user_ids):
+            Subscription.objects.filter(user_id__in=chunk, is_active=True).update(is_active=False)
+
+        subscriptions = []
+        for req in pending:
+            selected_plan = req.plan if req.plan and req.plan.price > 0 else fallback_plan
+            subscriptions.append(
+                Subscription(
+                    user_id=req.user_id,
+                    plan=selected_plan,
+                    start_date=today,
+                    end_date=today + timezone.timedelta(days=subscription_duration_days(selected_plan)),
+                    is_active=True,
+                )
+            )
+        Subscription.objects.bulk_create(subscriptions, batch_size=CHUNK_SIZE)
+
+        # Every row gets the same status and timestamp, so one UPDATE per chunk
+        # does what bulk_update would, without a CASE per row.
+        for chunk in _chunks([req.pk for req in pending]):
+            PremiumRequest.objects.filter(id__in=chunk, status="pending").update(status="approved", reviewed_at=now)
+
+        _tiers_changed(user_ids)
+    return len(pending)
+
+
+def reject_premium_requests(queryset):
+    """Reject the pending requests in ``queryset``. Returns the number rejected."""
+    now = timezone.now()
+    with transaction.atomic():
+        pending = list(queryset.filter(status="pending").order_by().values_list("id", "user_id"))
+        for chunk in _chunks([request_id for request_id, _ in pending]):
+            PremiumRequest.objects.filter(id__in=chunk, status="pending").update(status="rejected", reviewed_at=now)
+        if pending:
+            _tiers_changed([user_id for _, user_id in pending])
+    return len(pending)
@@ -0,0 +1,255 @@
+"""Parsing and validation stages for the project catalog importer.
+
+Nothing here touches the ORM, so validation can run in worker processes
+without setting up Django.
+"""
+import csv
+import gzip
+import hashlib
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import CommandError
+
+
+SKILL_LEVEL_NORMALIZATION = {
+    "beginner": "beginner",
+    "intermediate": "intermediate",
+    "advanced": "advanced",
+}
+
+PLAN_NORMALIZATION = {
+    "explorer": "explorer",
+    "free": "explorer",
+    "pro_monthly": "pro_monthly",
+    "pro monthly": "pro_monthly",
+    "monthly": "pro_monthly",
+    "pro_yearly": "pro_yearly",
+    "pro yearly": "pro_yearly",
+    "yearly": "pro_yearly",
+    "annual": "pro_yearly",
+}
+
+REQUIRED_COLUMNS = [
+    "title",
+    "description",
+    "field",
+    "target_role",
+    "skill_level",
+    "required_plan",
+    "tech_preference",
+    "learning_goal",
+    "interest_tags",
+]
+
+OPTIONAL_COLUMNS = [
+    "learning_objectives",
+    "resources",
+    "task_checklist",
+    "detailed_roadmap",
+    "premium_hints",
+]
+
+ALL_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+MATCH_COLUMNS = ["title", "field", "target_role"]
+
+# Set by the JSON Lines reader on lines that are not a JSON object.
+PARSE_ERROR_KEY = "_parse_error"
+
+
+def match_key(payload):
+    return tuple(payload[col] for col in MATCH_COLUMNS)
+
+
+def content_hash(payload):
+    """sha256 over the imported columns; equal hashes mean an import would not change the row."""
+    values = [str(payload.get(col) or "") for col in ALL_COLUMNS]
+    return hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def normalize_skill_level(value, row_index):
+    key = str(value).strip().lower()
+    normalized = SKILL_LEVEL_NORMALIZATION.get(key)
+    if not normalized:
+        valid = ", ".join(SKILL_LEVEL_NORMALIZATION.keys())
+        raise CommandError(f"Row {row_index}: invalid skill_level '{value}'. Valid: {valid}")
+    return normalized
+
+
+def normalize_plan(value, row_index):
+    key = str(value).strip().lower()
+    normalized = PLAN_NORMALIZATION.get(key)
+    if not normalized:
+        valid = ", ".join(sorted(PLAN_NORMALIZATION.keys()))
+        raise CommandError(f"Row {row_index}: invalid required_plan '{value}'. Valid: {valid}")
+    return normalized
+
+
+def build_payload(row, row_index):
+    for col in REQUIRED_COLUMNS:
+        if not row.get(col):
+            raise CommandError(f"Row {row_index}: '{col}' is required.")
+
+    skill_level = normalize_skill_level(row["skill_level"], row_index)
+    required_plan = normalize_plan(row["required_plan"], row_index)
+
+    payload = {
+        "title": row["title"],
+        "description": row["description"],
+        "field": row["field"],
+        "target_role": row["target_role"],
+        "skill_level": skill_level,
+        "required_plan": required_plan,
+        "tech_preference": row["tech_preference"],
+        "learning_goal": row["learning_goal"],
+        "interest_tags": row["interest_tags"],
+        "learning_objectives": row.get("learning_objectives", ""),
+        "resources": row.get("resources", ""),
+        "task_checklist": row.get("task_checklist", ""),
+        "detailed_roadmap": row.get("detailed_roadmap", ""),
+        "premium_hints": row.get("premium_hints", ""),
+    }
+
+    return payload
+
+
+def read_rows(reader, start=2):
+    """Stage 1: yield ``(row_index, row)`` with surrounding whitespace stripped."""
+    for row_index, raw_row in enumerate(reader, start=start):
+        yield row_index, {k: (v.strip() if isinstance(v, str) else v) for k, v in raw_row.items()}
+
+
+def _json_value(col, value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        # Lists become the same text the CSV columns hold: one item per line
+        # for the long-form columns, comma separated for tags and stacks.
+        separator = "\n" if col in OPTIONAL_COLUMNS else ", "
+        return separator.join(str(item).strip() for item in value)
+    return str(value).strip()
+
+
+def read_jsonl_rows(lines):
+    """Stage 1 for JSON Lines: one object per line, row numbers are line numbers."""
+    for row_index, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row_index, {PARSE_ERROR_KEY: f"Row {row_index}: invalid JSON ({exc})."}
+            continue
+        if not isinstance(record, dict):
+            yield row_index, {PARSE_ERROR_KEY: f"Row {row_index}: expected a JSON object."}
+            continue
+        yield row_index, {col: _json_value(col, value) for col, value in record.items()}
+
+
+def detect_format(path):
+    """Return ``(format, compressed)`` from the file name; anything else is read as CSV."""
+    suffixes = [suffix.lower() for suffix in path.suffixes[-2:]]
+    compressed = bool(suffixes) and suffixes[-1] == ".gz"
+    if compressed:
+        suffixes = suffixes[:-1]
+    if suffixes and suffixes[-1] in (".jsonl", ".ndjson"):
+        return "jsonl", compressed
+    return "csv", compressed
+
+
+@contextmanager
+def open_rows(path):
+    """Open a .csv/.jsonl file, optionally gzip-compressed, as ``(fieldnames, rows)``.
+
+    The file is decompressed and parsed as it is read; ``rows`` feeds
+    ``validate_rows`` directly.
+    """
+    file_format, compressed = detect_format(path)
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8-sig", newline="") as f:
+        if file_format == "jsonl":
+            yield list(ALL_COLUMNS), read_jsonl_rows(f)
+            return
+
+        reader = csv.DictReader(f)
+        if not reader.fieldnames:
+            raise CommandError("CSV has no header row.")
+        missing = [col for col in REQUIRED_COLUMNS if col not in reader.fieldnames]
+        if missing:
+            raise CommandError(f"Missing required columns: {', '.join(missing)}")
+        yield reader.fieldnames, read_rows(reader)
+
+
+def validate_chunk(chunk):
+    """Stage 2 for one chunk: ``(row_index, row, payload, error)`` per row."""
+    results = []
+    for row_index, row in chunk:
+        if PARSE_ERROR_KEY in row:
+            results.append((row_index, {}, None, row[PARSE_ERROR_KEY]))
+            continue
+        try:
+            results.append((row_index, row, build_payload(row, row_index), ""))
+        except CommandError as exc:
+            results.append((row_index, row, None, str(exc)))
+    return results
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_rows(rows, workers=1, chunk_size=1000):
+    """Stage 2: normalize and validate rows, keeping input order.
+
+    With ``workers`` > 1 chunks are validated in a process pool. At most two
+    chunks per worker are in flight, so memory stays bounded by
+    ``chunk_size`` rather than by the size of the input.
+    """
+    if workers <= 1:
+        for chunk in _chunked(rows, chunk_size):
+            yield from validate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in _chunked(rows, chunk_size):
+            in_flight.append(executor.submit(validate_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+class RejectedRowsWriter:
+    """Side-car CSV of rejected rows: row number, error, then the original columns.
+
+    The file is only created when the first row is rejected.
+    """
+
+    def __init__(self, path, fieldnames):
+        self.path = path
+        self.fieldnames = ["row_number", "error"] + [name for name in fieldnames if name not in ("row_number", "error")]
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, row_index, row, error):
+        if self._writer is None:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow({**row, "row_number": row_index, "error": error})
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,224 @@
+"""Per-view SQL query counts and timings for a sample of requests.
+
+``QueryMetricsMiddleware`` opens a ``RequestMetrics`` for sampled requests and
+``record_query`` (installed as an execute wrapper on every new connection)
+adds each query to it. Finished requests go into a per-process rolling window
+per view name, which ``query_metrics_snapshot`` summarizes.
+"""
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+_current = ContextVar("users_query_metrics", default=None)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+MAX_FINGERPRINTS = 200
+
+_WHITESPACE = re.compile(r"\s+")
+# Issued by every atomic() block; repeats of these are not worth reporting.
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE SAVEPOINT")
+
+
+def sample_rate():
+    return getattr(settings, "QUERY_METRICS_SAMPLE_RATE", 0.0)
+
+
+def window_size():
+    return getattr(settings, "QUERY_METRICS_WINDOW", 1000)
+
+
+def fingerprint(sql):
+    # Parameters are passed separately, so the statement text identifies the
+    # query shape; repeats of one shape are duplicates or N+1 lookups.
+    return hashlib.sha1(_WHITESPACE.sub(" ", sql).encode("utf-8")).hexdigest()[:12]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class RequestMetrics:
+    __slots__ = ("started", "queries", "sql_seconds", "fingerprints", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+
+    def add(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        if sql.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+            return
+        key = fingerprint(sql)
+        self.fingerprints[key] += 1
+        self.statements.setdefault(key, sql)
+
+    def duplicates(self):
+        return {key: count for key, count in self.fingerprints.items() if count > 1}
+
+    def repeated(self):
+        return sum(self.fingerprints.values()) - len(self.fingerprints)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add(sql, time.perf_counter() - started)
+
+
+def install_execute_wrapper(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ViewMetrics:
+    """Rolling window of (total_ms, sql_ms, queries) samples for one view."""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.duplicates = Counter()
+        self.statements = {}
+
+    def add(self, total_ms, metrics):
+        self.requests += 1
+        self.samples.append((total_ms, metrics.sql_seconds * 1000, metrics.queries))
+        for key, count in metrics.duplicates().items():
+            # Count the extra executions, not the first one.
+            self.duplicates[key] += count - 1
+            self.statements.setdefault(key, metrics.statements[key])
+        if len(self.duplicates) > MAX_FINGERPRINTS:
+            self.duplicates = Counter(dict(self.duplicates.most_common(MAX_FINGERPRINTS // 2)))
+            self.statements = {key: self.statements[key] for key in self.duplicates}
+
+    def summary(self, top=5):
+        totals = sorted(sample[0] for sample in self.samples)
+        sql_times = sorted(sample[1] for sample in self.samples)
+        queries = sorted(sample[2] for sample in self.samples)
+        histogram = Counter()
+        for total_ms in totals:
+            bucket = next((f"le_{bound}" for bound in LATENCY_BUCKETS_MS if total_ms <= bound), "inf")
+            histogram[bucket] += 1
+        return {
+            "requests": self.requests,
+            "window": len(self.samples),
+            "total_ms": {pct: round(percentile(totals, value), 3) for pct, value in (("p50", 50), ("p95", 95), ("p99", 99))},
+            "sql_ms": {pct: round(percentile(sql_times, value), 3) for pct, value in (("p50", 50), ("p95", 95), ("p99", 99))},
+            "queries": {
+                "p50": percentile(queries, 50),
+                "max": queries[-1] if queries else 0,
+                "mean": round(sum(queries) / len(queries), 2) if queries else 0.0,
+            },
+            "histogram_ms": {f"le_{bound}": histogram[f"le_{bound}"] for bound in LATENCY_BUCKETS_MS} | {"inf": histogram["inf"]},
+            "duplicate_queries": [
+                {"fingerprint": key, "extra_executions": count, "sql": self.statements[key][:500]}
+                for key, count in self.duplicates.most_common(top)
+            ],
+        }
+
+
+_views = {}
+_views_lock = threading.Lock()
+
+
+def record_request(view_name, total_ms, metrics):
+    with _views_lock:
+        stats = _views.get(view_name)
+        if stats is None:
+            stats = _views[view_name] = ViewMetrics(window_size())
+        stats.add(total_ms, metrics)
+
+
+def query_metrics_snapshot(top=5):
+    with _views_lock:
+        return {name: stats.summary(top) for name, stats in sorted(_views.items())}
+
+
+def reset_query_metrics():
+    with _views_lock:
+        _views.clear()
+
+
+def server_timing(total_ms, metrics):
+    return (
+        f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.queries} queries", '
+        f'dup;desc="{metrics.repeated()} repeated", '
+        f"total;dur={total_ms:.1f}"
+    )
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "unresolved"
+
+
+class QueryMetricsMiddleware:
+    """Record query count, SQL time and duplicates for a sample of requests.
+
+    Sampled responses get a ``Server-Timing`` header; unsampled requests cost
+    one random draw here and one context variable lookup per query.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        rate = sample_rate()
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def _finish(self, request, response, metrics):
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        record_request(_view_name(request), total_ms, metrics)
+        response.headers["Server-Timing"] = server_timing(total_ms, metrics)
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
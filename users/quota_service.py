@@ -0,0 +1,134 @@
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailyRecommendationUsage
+
+
+_pending = {}
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _increment_with_upsert(user_id, usage_date, limit):
+    table = connection.ops.quote_name(DailyRecommendationUsage._meta.db_table)
+    count = connection.ops.quote_name("count")
+    sql = (
+        f"INSERT INTO {table} (user_id, usage_date, {count}) VALUES (%s, %s, 1) "
+        f"ON CONFLICT (user_id, usage_date) DO UPDATE SET {count} = {table}.{count} + 1 "
+        f"WHERE {table}.{count} < %s "
+        f"RETURNING {count}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, connection.ops.adapt_datefield_value(usage_date), limit])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _increment_with_update(user_id, usage_date, limit):
+    usage = DailyRecommendationUsage.objects.filter(user_id=user_id, usage_date=usage_date)
+    if usage.filter(count__lt=limit).update(count=F("count") + 1):
+        return usage.values_list("count", flat=True).first()
+    try:
+        with transaction.atomic():
+            DailyRecommendationUsage.objects.create(user_id=user_id, usage_date=usage_date, count=1)
+        return 1
+    except IntegrityError:
+        # Another request created today's row first.
+        if usage.filter(count__lt=limit).update(count=F("count") + 1):
+            return usage.values_list("count", flat=True).first()
+    return None
+
+
+def _increment_in_database(user_id, usage_date, limit):
+    if connection.vendor in ("sqlite", "postgresql") and connection.features.can_return_columns_from_insert:
+        return _increment_with_upsert(user_id, usage_date, limit)
+    return _increment_with_update(user_id, usage_date, limit)
+
+
+def _quota_cache_key(user_id, usage_date):
+    return f"users:reco_quota:{user_id}:{usage_date.isoformat()}"
+
+
+def _seconds_until_tomorrow(usage_date):
+    tomorrow = timezone.make_aware(datetime.combine(usage_date + timedelta(days=1), datetime.min.time()))
+    return max(1, int((tomorrow - timezone.now()).total_seconds()))
+
+
+def _increment_in_cache(user_id, usage_date, limit):
+    key = _quota_cache_key(user_id, usage_date)
+    if cache.get(key) is None:
+        stored = (
+            DailyRecommendationUsage.objects.filter(user_id=user_id, usage_date=usage_date)
+            .values_list("count", flat=True)
+            .first()
+        )
+        cache.add(key, stored or 0, _seconds_until_tomorrow(usage_date))
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); count straight in the table.
+        return _increment_in_database(user_id, usage_date, limit)
+    if count > limit:
+        return None
+
+    with _pending_lock:
+        _pending[(user_id, usage_date)] = max(count, _pending.get((user_id, usage_date), 0))
+        due = (
+            len(_pending) >= getattr(settings, "RECOMMENDATION_QUOTA_FLUSH_SIZE", 100)
+            or time.monotonic() - _last_flush >= getattr(settings, "RECOMMENDATION_QUOTA_FLUSH_INTERVAL", 60)
+        )
+    if due:
+        flush_quota_counters()
+    return count
+
+
+def flush_quota_counters():
+    """Write counts collected on the cache fast path to the usage table."""
+    global _last_flush
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    DailyRecommendationUsage.objects.bulk_create(
+        [
+            DailyRecommendationUsage(user_id=user_id, usage_date=usage_date, count=count)
+            for (user_id, usage_date), count in pending.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["user", "usage_date"],
+        update_fields=["count"],
+    )
+    return len(pending)
+
+
+def consume_recommendation_quota(user, limit, usage_date=None):
+    """Count one recommendation run against today's quota.
+
+    Returns ``(count, limited)``. The increment only happens while the count
+    is below ``limit``; when it is already at the limit nothing is written and
+    ``(limit, True)`` is returned.
+    """
+    usage_date = usage_date or timezone.localdate()
+    if getattr(settings, "RECOMMENDATION_QUOTA_CACHE", False):
+        count = _increment_in_cache(user.pk, usage_date, limit)
+    else:
+        count = _increment_in_database(user.pk, usage_date, limit)
+    if count is None:
+        return limit, True
+    return count, False
+
+
+@atexit.register
+def _flush_on_exit():
+    if _pending:
+        flush_quota_counters()
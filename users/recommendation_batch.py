@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .catalog_version import read_catalog_version
+from .models import RecommendationSnapshot, UserProfile
+from .recommendation_cache import profile_cache_key, warm_recommendation_cache
+from .recommendation_service import recommend_projects_for_profiles
+from .subscription_service import get_subscription_tiers
+
+
+PROFILE_FIELDS = ("user_id", "field", "skill_level", "tech_preference", "learning_goal", "interest_tags", "match_tokens")
+
+
+def score_profile_chunk(profile_ids, limit, catalog_version=None):
+    """Return ``(user_id, plan_tier, items, cache_key)`` rows for one chunk of profiles."""
+    profiles = list(UserProfile.objects.filter(id__in=profile_ids).only(*PROFILE_FIELDS))
+    tiers = {user_id: tier for user_id, (tier, _) in get_subscription_tiers([p.user_id for p in profiles]).items()}
+    results = recommend_projects_for_profiles(profiles, tiers, limit=limit, catalog_version=catalog_version)
+    return [
+        (profile.user_id, tiers[profile.user_id], results[profile.user_id], profile_cache_key(profile, tiers[profile.user_id]))
+        for profile in profiles
+    ]
+
+
+def write_snapshots(rows, limit, catalog_version):
+    computed_at = timezone.now()
+    snapshots = [
+        RecommendationSnapshot(
+            user_id=user_id,
+            plan_tier=plan_tier,
+            items=items,
+            computed_at=computed_at,
+            cache_key=key,
+            catalog_version=catalog_version,
+            result_limit=limit,
+        )
+        for user_id, plan_tier, items, key in rows
+    ]
+    with transaction.atomic():
+        RecommendationSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["plan_tier", "items", "computed_at", "cache_key", "catalog_version", "result_limit"],
+        )
+    warm_recommendation_cache(rows, limit, catalog_version)
+    return len(snapshots)
+
+
+def _init_worker():
+    if not apps.ready:
+        django.setup()
+    # Forked workers must not reuse the parent's database handles.
+    connections.close_all()
+
+
+def _chunked(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def precompute_recommendations(profiles=None, limit=6, chunk_size=500, workers=1, on_chunk=None):
+    """Score ``profiles`` in chunks and persist the top ``limit`` per user.
+
+    Scoring runs in ``workers`` processes, each with its own catalog index;
+    snapshots are written by the calling process only, so SQLite sees a
+    single writer. Returns the number of snapshots written.
+    """
+    profiles = UserProfile.objects.all() if profiles is None else profiles
+    profile_ids = list(profiles.order_by("id").values_list("id", flat=True))
+    chunks = list(_chunked(profile_ids, chunk_size))
+    # Stamp with the version seen before scoring; a catalog write during the
+    # run then correctly marks these snapshots as stale.
+    catalog_version = read_catalog_version()
+    written = 0
+
+    if workers <= 1:
+        for chunk in chunks:
+            written += write_snapshots(score_profile_chunk(chunk, limit, catalog_version), limit, catalog_version)
+            if on_chunk:
+                on_chunk(written, len(profile_ids))
+        return written
+
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for rows in executor.map(score_profile_chunk, chunks, [limit] * len(chunks), [catalog_version] * len(chunks)):
+            written += write_snapshots(rows, limit, catalog_version)
+            if on_chunk:
+                on_chunk(written, len(profile_ids))
+    return written
@@ -0,0 +1,128 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Subquery
+from django.utils import timezone
+
+from .catalog_version import CATALOG_VERSION_CACHE_KEY, cache_catalog_version, read_catalog_version
+from .models import CatalogVersion, RecommendationSnapshot
+from .recommendation_service import recommend_projects_for_profile
+
+
+PROFILE_MATCH_FIELDS = ("field", "skill_level", "tech_preference", "learning_goal", "interest_tags")
+
+
+def profile_cache_key(profile, user_plan_tier):
+    parts = [str(getattr(profile, name) or "") for name in PROFILE_MATCH_FIELDS] + [str(user_plan_tier)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _entry_cache_key(user_id):
+    return f"users:recommendations:{user_id}"
+
+
+def _use_cache_framework():
+    backend = getattr(settings, "RECOMMENDATION_CACHE_BACKEND", "auto")
+    if backend == "auto":
+        # The default LocMemCache is per-process; fall back to the table
+        # unless a shared cache has been configured explicitly.
+        return settings.is_overridden("CACHES")
+    return backend == "cache"
+
+
+def _get_from_cache(user_id, key, limit):
+    values = cache.get_many([CATALOG_VERSION_CACHE_KEY, _entry_cache_key(user_id)])
+    catalog_version = values.get(CATALOG_VERSION_CACHE_KEY)
+    if catalog_version is None:
+        catalog_version = read_catalog_version()
+        cache_catalog_version(catalog_version)
+    entry = values.get(_entry_cache_key(user_id))
+    if (
+        entry
+        and entry["key"] == key
+        and entry["catalog_version"] == catalog_version
+        and entry["limit"] >= limit
+    ):
+        return entry["items"][:limit], catalog_version
+    return None, catalog_version
+
+
+def _get_from_table(user_id, key, limit):
+    items = (
+        RecommendationSnapshot.objects.filter(
+            user_id=user_id,
+            cache_key=key,
+            result_limit__gte=limit,
+            catalog_version=Subquery(CatalogVersion.objects.filter(pk=1).values("version")[:1]),
+        )
+        .values_list("items", flat=True)
+        .first()
+    )
+    if items is not None:
+        return items[:limit], None
+    return None, read_catalog_version()
+
+
+def store_recommendations(user_id, key, user_plan_tier, items, limit, catalog_version):
+    if _use_cache_framework():
+        cache.set(
+            _entry_cache_key(user_id),
+            {"key": key, "catalog_version": catalog_version, "limit": limit, "items": items},
+            getattr(settings, "RECOMMENDATION_CACHE_TIMEOUT", 86400),
+        )
+        return
+    RecommendationSnapshot.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            "plan_tier": user_plan_tier,
+            "items": items,
+            "computed_at": timezone.now(),
+            "cache_key": key,
+            "catalog_version": catalog_version,
+            "result_limit": limit,
+        },
+    )
+
+
+def get_cached_recommendations(profile, limit=6, user_plan_tier="explorer"):
+    """Return recommendations for ``profile``, computing them only on a miss.
+
+    Entries are keyed by a hash of the profile's matching fields and plan tier
+    and are only served for the current catalog version, so a profile edit or
+    any catalog write makes them stale without touching every entry.
+    """
+    key = profile_cache_key(profile, user_plan_tier)
+    if _use_cache_framework():
+        items, catalog_version = _get_from_cache(profile.user_id, key, limit)
+    else:
+        items, catalog_version = _get_from_table(profile.user_id, key, limit)
+    if items is not None:
+        return items
+
+    items = recommend_projects_for_profile(
+        profile,
+        limit=limit,
+        user_plan_tier=user_plan_tier,
+        catalog_version=catalog_version,
+    )
+    store_recommendations(profile.user_id, key, user_plan_tier, items, limit, catalog_version)
+    return items
+
+
+def warm_recommendation_cache(rows, limit, catalog_version):
+    """Push precomputed ``(user_id, plan_tier, items, key)`` rows into the cache."""
+    if not _use_cache_framework():
+        return
+    cache.set_many(
+        {
+            _entry_cache_key(user_id): {"key": key, "catalog_version": catalog_version, "limit": limit, "items": items}
+            for user_id, _, items, key in rows
+        },
+        getattr(settings, "RECOMMENDATION_CACHE_TIMEOUT", 86400),
+    )
+
+
+def invalidate_user_recommendations(user_id):
+    cache.delete(_entry_cache_key(user_id))
+    RecommendationSnapshot.objects.filter(user_id=user_id).update(cache_key="")
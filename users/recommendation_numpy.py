@@ -0,0 +1,151 @@
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .recommendation_service import PLAN_RANK
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - depends on the deployment
+    raise ImproperlyConfigured("RECOMMENDATION_ENGINE='numpy' requires numpy to be installed.") from exc
+
+
+UNKNOWN_TIER_RANK = len(PLAN_RANK) + 1
+
+
+def _encode(values):
+    vocab = {}
+    codes = np.fromiter((vocab.setdefault(value, len(vocab)) for value in values), dtype=np.int32, count=len(values))
+    return codes, list(vocab)
+
+
+def _vocab_mask(vocab, predicate):
+    return np.fromiter((predicate(value) for value in vocab), dtype=bool, count=len(vocab))
+
+
+class NumpyCatalog:
+    """Column-oriented encoding of a ``CatalogIndex``.
+
+    Rows are stored in ``(title.lower(), id)`` order, so a row's position is
+    also its tie-break rank and ``(-score, position)`` reproduces the ordering
+    of the pure Python engine. String containment checks run once per distinct
+    value and are broadcast to rows through the integer code columns.
+    """
+
+    def __init__(self, index):
+        records = sorted(index.records.values(), key=lambda record: (record.title_key, record.id))
+        self.records = records
+        self.size = len(records)
+        self.positions = np.arange(self.size, dtype=np.int64)
+
+        self.skill_codes, skill_vocab = _encode([record.skill_level for record in records])
+        self.skill_lookup = {value: code for code, value in enumerate(skill_vocab)}
+        self.tier_rank = np.array(
+            [PLAN_RANK.get(record.required_plan, UNKNOWN_TIER_RANK) for record in records],
+            dtype=np.int8,
+        )
+
+        self.field_codes, field_vocab = _encode([record.field_key for record in records])
+        self.field_lookup = {value: code for code, value in enumerate(field_vocab)}
+        self.raw_field_codes, raw_field_vocab = _encode([str(record.field or "").lower() for record in records])
+        self.raw_field_lookup = {value: code for code, value in enumerate(raw_field_vocab)}
+
+        self.tech_codes, self.tech_vocab = _encode([record.tech_key for record in records])
+        self.raw_tech_codes, self.raw_tech_vocab = _encode([str(record.tech_preference or "").lower() for record in records])
+        self.goal_codes, self.goal_vocab = _encode([record.goal_key for record in records])
+        self.raw_goal_codes, self.raw_goal_vocab = _encode([str(record.learning_goal or "").lower() for record in records])
+
+        # Tag membership as a compressed sparse column matrix: the rows holding
+        # tag ``t`` are ``tag_rows[tag_ptr[t]:tag_ptr[t + 1]]``.
+        postings = {}
+        for position, record in enumerate(records):
+            for tag in record.tag_keys:
+                postings.setdefault(tag, []).append(position)
+        self.tag_vocab = list(postings)
+        self.tag_lookup = {tag: code for code, tag in enumerate(self.tag_vocab)}
+        self.tag_ptr = np.zeros(len(self.tag_vocab) + 1, dtype=np.int64)
+        self.tag_ptr[1:] = np.cumsum([len(rows) for rows in postings.values()])
+        self.tag_rows = np.fromiter(
+            (position for rows in postings.values() for position in rows),
+            dtype=np.int64,
+            count=int(self.tag_ptr[-1]),
+        )
+
+    def _tag_rows(self, tag_codes):
+        if not len(tag_codes):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.tag_rows[self.tag_ptr[code]:self.tag_ptr[code + 1]] for code in tag_codes])
+
+    def candidate_mask(self, query):
+        skill_code = self.skill_lookup.get(query.skill_level)
+        if skill_code is None:
+            return np.zeros(self.size, dtype=bool)
+        mask = (self.skill_codes == skill_code) & (self.tier_rank <= query.user_rank)
+
+        conditions = None
+        if query.field:
+            code = self.raw_field_lookup.get(query.raw_field, -1)
+            conditions = self.raw_field_codes == code
+        if query.tech:
+            matched = _vocab_mask(self.raw_tech_vocab, lambda value: query.raw_tech in value)[self.raw_tech_codes]
+            conditions = matched if conditions is None else conditions | matched
+        if query.goal:
+            matched = _vocab_mask(self.raw_goal_vocab, lambda value: query.raw_goal in value)[self.raw_goal_codes]
+            conditions = matched if conditions is None else conditions | matched
+        if query.tags:
+            tag_codes = [code for code, tag in enumerate(self.tag_vocab) if any(needle in tag for needle in query.tags)]
+            matched = np.zeros(self.size, dtype=bool)
+            matched[self._tag_rows(tag_codes)] = True
+            conditions = matched if conditions is None else conditions | matched
+
+        if conditions is not None:
+            mask &= conditions
+        return mask
+
+    def scores(self, query):
+        scores = np.full(self.size, 4, dtype=np.int64)
+        if query.field and query.field in self.field_lookup:
+            scores += 4 * (self.field_codes == self.field_lookup[query.field])
+        if query.tech:
+            tech = query.tech
+            scores += 3 * _vocab_mask(self.tech_vocab, lambda value: tech in value or value in tech)[self.tech_codes]
+        if query.goal:
+            goal = query.goal
+            scores += 2 * _vocab_mask(self.goal_vocab, lambda value: goal in value or value in goal)[self.goal_codes]
+        tag_codes = [self.tag_lookup[tag] for tag in query.tags if tag in self.tag_lookup]
+        if tag_codes:
+            scores += 2 * np.bincount(self._tag_rows(tag_codes), minlength=self.size)
+        return scores
+
+    def rank(self, query, limit):
+        candidates = np.flatnonzero(self.candidate_mask(query))
+        if limit <= 0 or not len(candidates):
+            return []
+
+        scores = self.scores(query)[candidates]
+        keys = -scores * self.size + self.positions[candidates]
+        if limit < len(keys):
+            top = np.argpartition(keys, limit - 1)[:limit]
+            top = top[np.argsort(keys[top])]
+        else:
+            top = np.argsort(keys)
+        return [(int(scores[i]), self.records[candidates[i]]) for i in top]
+
+
+_encoded = None
+_encoded_lock = threading.Lock()
+
+
+def get_numpy_catalog(index):
+    global _encoded
+    encoded = _encoded
+    if encoded is not None and encoded[0] is index:
+        return encoded[1]
+    with _encoded_lock:
+        if _encoded is None or _encoded[0] is not index:
+            _encoded = (index, NumpyCatalog(index))
+        return _encoded[1]
+
+
+def rank_projects(index, query, limit):
+    return get_numpy_catalog(index).rank(query, limit)
@@ -1,5 +1,11 @@
-from django.db.models import Q
+import heapq
+import threading
+from collections import namedtuple
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .match_tokens import build_match_tokens, normalize, split_csv
 from .models import Project
 
 
@@ -9,91 +15,243 @@ PLAN_RANK = {
     "pro_yearly": 2,
 }
 
+INDEX_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "field",
+    "target_role",
+    "skill_level",
+    "required_plan",
+    "tech_preference",
+    "learning_goal",
+    "interest_tags",
+)
 
-def _normalize(value):
-    return str(value or "").strip().lower()
+ProjectRecord = namedtuple(
+    "ProjectRecord",
+    INDEX_COLUMNS + ("title_key", "field_key", "tech_key", "goal_key", "tag_keys"),
+)
 
+ProfileQuery = namedtuple(
+    "ProfileQuery",
+    ("skill_level", "allowed_tiers", "user_rank", "field", "tech", "goal", "tags", "raw_field", "raw_tech", "raw_goal"),
+)
 
-def _split_tags(value):
-    return {tag.strip().lower() for tag in str(value or "").split(",") if tag.strip()}
 
+def _match_tokens(instance):
+    # Rows written before the column existed, or with queryset.update(), may
+    # not have tokens yet.
+    tokens = getattr(instance, "match_tokens", None)
+    if tokens:
+        return tokens
+    return build_match_tokens(instance.field, instance.tech_preference, instance.learning_goal, instance.interest_tags)
 
-def recommend_projects_for_profile(profile, limit=6, user_plan_tier="explorer"):
-    profile_field = _normalize(profile.field)
-    profile_skill = _normalize(profile.skill_level)
-    profile_tech = _normalize(profile.tech_preference)
-    profile_goal = _normalize(profile.learning_goal)
-    profile_tags = _split_tags(profile.interest_tags)
 
-    if not profile_skill:
-        return []
+def _build_record(row):
+    *values, tokens = row
+    record = dict(zip(INDEX_COLUMNS, values))
+    if not tokens:
+        tokens = build_match_tokens(record["field"], record["tech_preference"], record["learning_goal"], record["interest_tags"])
+    return ProjectRecord(
+        title_key=str(record["title"]).lower(),
+        field_key=tokens["field"],
+        tech_key=tokens["tech"],
+        goal_key=tokens["goal"],
+        tag_keys=frozenset(tokens["tags"]),
+        **record,
+    )
+
+
+class CatalogIndex:
+    """Read-only snapshot of the project catalog used for recommendations.
+
+    The lookup tables mirror the candidate filter the ORM query used to build:
+    ``field__iexact`` becomes a dict lookup, the ``icontains`` filters become a
+    scan over the (small) set of distinct values instead of over every row.
+    """
+
+    def __init__(self, rows):
+        self.catalog_version = None
+        self.records = {}
+        self.buckets = {}
+        self.by_field = {}
+        self.by_tech = {}
+        self.by_goal = {}
+        self.by_tag = {}
+
+        for row in rows:
+            record = _build_record(row)
+            project_id = record.id
+            self.records[project_id] = record
+            self.buckets.setdefault((record.skill_level, record.required_plan), set()).add(project_id)
+            self.by_field.setdefault(str(record.field or "").lower(), set()).add(project_id)
+            self.by_tech.setdefault(str(record.tech_preference or "").lower(), set()).add(project_id)
+            self.by_goal.setdefault(str(record.learning_goal or "").lower(), set()).add(project_id)
+            for tag in record.tag_keys:
+                self.by_tag.setdefault(tag, set()).add(project_id)
+
+    @classmethod
+    def build(cls):
+        rows = Project.objects.order_by().values_list(*INDEX_COLUMNS, "match_tokens")
+        return cls(rows.iterator(chunk_size=2000))
+
+    def bucket_ids(self, skill_level, allowed_tiers):
+        ids = set()
+        for tier in allowed_tiers:
+            ids.update(self.buckets.get((skill_level, tier), ()))
+        return ids
+
+    def matching_ids(self, query):
+        matched = None
+        if query.field:
+            matched = set(self.by_field.get(query.raw_field, ()))
+        if query.tech:
+            matched = _union_containing(self.by_tech, (query.raw_tech,), matched)
+        if query.goal:
+            matched = _union_containing(self.by_goal, (query.raw_goal,), matched)
+        if query.tags:
+            matched = _union_containing(self.by_tag, query.tags, matched)
+        return matched
+
+    def candidates(self, query):
+        ids = self.bucket_ids(query.skill_level, query.allowed_tiers)
+        matched = self.matching_ids(query)
+        if matched is not None:
+            ids &= matched
+        return [self.records[project_id] for project_id in ids]
+
+
+def _union_containing(index, needles, matched):
+    matched = set() if matched is None else matched
+    for key, ids in index.items():
+        if any(needle in key for needle in needles):
+            matched.update(ids)
+    return matched
+
+
+_catalog_index = None
+_catalog_index_lock = threading.Lock()
+
+
+def get_catalog_index(catalog_version=None):
+    """Return the process-wide catalog index, building it on first use.
+
+    Passing ``catalog_version`` also rebuilds an index built for an older
+    version, which picks up catalog writes made by other processes.
+    """
+    global _catalog_index
+    index = _catalog_index
+    if index is not None and (catalog_version is None or index.catalog_version == catalog_version):
+        return index
+    with _catalog_index_lock:
+        index = _catalog_index
+        if index is None or (catalog_version is not None and index.catalog_version != catalog_version):
+            index = CatalogIndex.build()
+            index.catalog_version = catalog_version
+            _catalog_index = index
+        return index
+
+
+def invalidate_catalog_index():
+    global _catalog_index
+    _catalog_index = None
+
 
+def build_profile_query(profile, user_plan_tier="explorer"):
     user_rank = PLAN_RANK.get(user_plan_tier, 0)
-    allowed_tiers = [tier for tier, rank in PLAN_RANK.items() if rank <= user_rank]
-
-    tag_filter = None
-    for tag in profile_tags:
-        condition = Q(interest_tags__icontains=tag)
-        tag_filter = condition if tag_filter is None else tag_filter | condition
-
-    candidate_filter = None
-    if profile_field:
-        condition = Q(field__iexact=profile.field)
-        candidate_filter = condition if candidate_filter is None else candidate_filter | condition
-    if profile_tech:
-        condition = Q(tech_preference__icontains=profile.tech_preference)
-        candidate_filter = condition if candidate_filter is None else candidate_filter | condition
-    if profile_goal:
-        condition = Q(learning_goal__icontains=profile.learning_goal)
-        candidate_filter = condition if candidate_filter is None else candidate_filter | condition
-    if tag_filter is not None:
-        candidate_filter = tag_filter if candidate_filter is None else candidate_filter | tag_filter
-
-    projects_qs = Project.objects.filter(skill_level=profile.skill_level, required_plan__in=allowed_tiers)
-    if candidate_filter is not None:
-        projects_qs = projects_qs.filter(candidate_filter)
-
-    scored = []
-    for project in projects_qs:
-        score = 0
-
-        project_field = _normalize(project.field)
-        project_tech = _normalize(project.tech_preference)
-        project_goal = _normalize(project.learning_goal)
-        project_tags = _split_tags(project.interest_tags)
-
-        if profile_field and project_field == profile_field:
-            score += 4
+    tokens = _match_tokens(profile)
+    return ProfileQuery(
+        skill_level=profile.skill_level,
+        allowed_tiers=[tier for tier, rank in PLAN_RANK.items() if rank <= user_rank],
+        user_rank=user_rank,
+        field=tokens["field"],
+        tech=tokens["tech"],
+        goal=tokens["goal"],
+        tags=set(tokens["tags"]),
+        raw_field=str(profile.field or "").lower(),
+        raw_tech=str(profile.tech_preference or "").lower(),
+        raw_goal=str(profile.learning_goal or "").lower(),
+    )
 
+
+def _score_record(record, query):
+    score = 4
+
+    if query.field and record.field_key == query.field:
         score += 4
 
-        if profile_tech and (profile_tech in project_tech or project_tech in profile_tech):
-            score += 3
-
-        if profile_goal and (profile_goal in project_goal or project_goal in profile_goal):
-            score += 2
-
-        overlap = profile_tags.intersection(project_tags)
-        if overlap:
-            score += len(overlap) * 2
-
-        scored.append((score, project))
-
-    scored.sort(key=lambda item: (-item[0], item[1].title.lower(), item[1].id))
-
-    return [
-        {
-            "id": project.id,
-            "title": project.title,
-            "category": project.field,
-            "difficulty": project.skill_level,
-            "summary": project.description,
-            "required_plan": project.required_plan,
-            "stack": [token.strip() for token in str(project.tech_preference).split(",") if token.strip()],
-            "target_role": project.target_role,
-            "learning_goal": project.learning_goal,
-            "interest_tags": project.interest_tags,
-            "relevance_score": score,
-        }
-        for score, project in scored[:limit]
-    ]
+    project_tech = record.tech_key
+    if query.tech and (query.tech in project_tech or project_tech in query.tech):
+        score += 3
+
+    project_goal = record.goal_key
+    if query.goal and (query.goal in project_goal or project_goal in query.goal):
+        score += 2
+
+    overlap = query.tags.intersection(record.tag_keys)
+    if overlap:
+        score += len(overlap) * 2
+
+    return score
+
+
+def rank_projects(index, query, limit):
+    scored = [(-_score_record(record, query), record.title_key, record.id, record) for record in index.candidates(query)]
+    top = heapq.nsmallest(limit, scored, key=lambda item: item[:3])
+    return [(-negative_score, record) for negative_score, _, _, record in top]
+
+
+def get_ranking_engine():
+    engine = getattr(settings, "RECOMMENDATION_ENGINE", "python")
+    if engine == "python":
+        return rank_projects
+    if engine == "numpy":
+        from .recommendation_numpy import rank_projects as rank_projects_numpy
+
+        return rank_projects_numpy
+    raise ImproperlyConfigured(f"Unknown RECOMMENDATION_ENGINE '{engine}'. Use 'python' or 'numpy'.")
+
+
+def _record_to_recommendation(record, score):
+    return {
+        "id": record.id,
+        "title": record.title,
+        "category": record.field,
+        "difficulty": record.skill_level,
+        "summary": record.description,
+        "required_plan": record.required_plan,
+        "stack": split_csv(record.tech_preference),
+        "target_role": record.target_role,
+        "learning_goal": record.learning_goal,
+        "interest_tags": record.interest_tags,
+        "relevance_score": score,
+    }
+
+
+def _recommend(index, rank, profile, limit, user_plan_tier):
+    if not normalize(profile.skill_level):
+        return []
+
+    query = build_profile_query(profile, user_plan_tier)
+    return [_record_to_recommendation(record, score) for score, record in rank(index, query, limit)]
+
+
+def recommend_projects_for_profile(profile, limit=6, user_plan_tier="explorer", catalog_version=None):
+    return _recommend(get_catalog_index(catalog_version), get_ranking_engine(), profile, limit, user_plan_tier)
+
+
+def recommend_projects_for_profiles(profiles, user_plan_tiers, limit=6, catalog_version=None):
+    """Score many profiles against a single catalog snapshot.
+
+    ``user_plan_tiers`` maps ``user_id`` to a plan tier; returns a dict of
+    ``user_id`` to the same list ``recommend_projects_for_profile`` builds.
+    Pass the ``catalog_version`` the results will be stamped with, so an index
+    built before another process's catalog write is rebuilt first.
+    """
+    index = get_catalog_index(catalog_version)
+    rank = get_ranking_engine()
+    return {
+        profile.user_id: _recommend(index, rank, profile, limit, user_plan_tiers.get(profile.user_id, "explorer"))
+        for profile in profiles
+    }
@@ -0,0 +1,86 @@
+from django.db import IntegrityError, transaction
+
+from .models import Project, SavedProject, TaskProgress
+
+
+FREE_SAVED_PROJECT_LIMIT = 5
+
+
+def count_tasks(phases):
+    return sum(len(phase.get("tasks", [])) for phase in phases)
+
+
+def task_ids(phases):
+    return {task.get("id") for phase in phases for task in phase.get("tasks", [])}
+
+
+def get_saved_project(user, key):
+    return SavedProject.objects.filter(user=user, key=key).first()
+
+
+def save_project(user, key, **fields):
+    """Create the saved project ``key`` for ``user`` (or return the existing one)."""
+    try:
+        with transaction.atomic():
+            return SavedProject.objects.create(user=user, key=key, **fields)
+    except IntegrityError:
+        return SavedProject.objects.get(user=user, key=key)
+
+
+def can_save_another(user):
+    return SavedProject.objects.filter(user=user).count() < FREE_SAVED_PROJECT_LIMIT
+
+
+def reset_phases(saved_project, phases):
+    with transaction.atomic():
+        TaskProgress.objects.filter(saved_project=saved_project).delete()
+        saved_project.phases = phases
+        saved_project.total_tasks = count_tasks(phases)
+        saved_project.completed_tasks = 0
+        saved_project.save(update_fields=["phases", "total_tasks", "completed_tasks"])
+
+
+def get_completed_task_ids(saved_project):
+    return set(TaskProgress.objects.filter(saved_project=saved_project).values_list("task_id", flat=True))
+
+
+def set_completed_task_ids(saved_project, completed):
+    """Replace the saved project's progress with ``completed`` and return it."""
+    completed = set(completed) & task_ids(saved_project.phases)
+    with transaction.atomic():
+        TaskProgress.objects.filter(saved_project=saved_project).exclude(task_id__in=completed).delete()
+        TaskProgress.objects.bulk_create(
+            [TaskProgress(saved_project=saved_project, task_id=task_id) for task_id in completed],
+            ignore_conflicts=True,
+        )
+        saved_project.completed_tasks = len(completed)
+        saved_project.save(update_fields=["completed_tasks"])
+    return completed
+
+
+def import_session_projects(request):
+    """Move projects saved by the old session-based workspace into the database."""
+    my_projects = request.session.pop("my_projects", None)
+    if not my_projects:
+        return
+    for key, project in my_projects.items():
+        phases = request.session.pop(f"phases_{key}", [])
+        completed = request.session.pop(f"progress_{key}", [])
+        project_pk = project.get("project_pk")
+        if project_pk and not Project.objects.filter(pk=project_pk).exists():
+            project_pk = None
+        saved = save_project(
+            request.user,
+            key,
+            source=project.get("source", "recommendation"),
+            project_id=project_pk,
+            recommendation_index=project.get("index"),
+            title=str(project.get("title") or "")[:140],
+            category=str(project.get("category") or "")[:100],
+            difficulty=str(project.get("difficulty") or "")[:20],
+            summary=project.get("summary") or "",
+            phases=phases,
+            total_tasks=count_tasks(phases),
+        )
+        if completed:
+            set_completed_task_ids(saved, completed)
@@ -0,0 +1,114 @@
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = "users_project_fts"
+FTS_COLUMNS = ("title", "description", "field", "target_role", "tech_preference", "interest_tags")
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Characters the FTS tokenizer drops ("C++", "C#", ".NET"); such queries use icontains.
+SYMBOL_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+_fts_available = {}
+
+
+def search_index_available(using=connection):
+    if using.vendor != "sqlite":
+        return False
+    alias = using.alias
+    if alias not in _fts_available:
+        _fts_available[alias] = FTS_TABLE in using.introspection.table_names()
+    return _fts_available[alias]
+
+
+def rebuild_search_index(using=connection):
+    if not search_index_available(using):
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM users_project")
+
+
+def index_project(project, using=connection):
+    if not search_index_available(using):
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    placeholders = ", ".join(["%s"] * (len(FTS_COLUMNS) + 1))
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [project.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})",
+            [project.pk] + [getattr(project, column) for column in FTS_COLUMNS],
+        )
+
+
+def index_projects(projects, using=connection):
+    """Re-index ``projects`` (saved instances) without rebuilding the whole table."""
+    if not projects or not search_index_available(using):
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    placeholders = ", ".join(["%s"] * (len(FTS_COLUMNS) + 1))
+    with using.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[project.pk] for project in projects])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})",
+            [[project.pk] + [getattr(project, column) for column in FTS_COLUMNS] for project in projects],
+        )
+
+
+def unindex_project(project_id, using=connection):
+    if not search_index_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [project_id])
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    tokens = TOKEN_RE.findall(str(query or "").lower())
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def ranked_project_ids(match, using=connection):
+    """Ids of the projects matching the FTS5 expression ``match``, best BM25 rank first."""
+    with using.cursor() as cursor:
+        cursor.execute(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank, rowid", [match])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _filter_with_orm(projects_qs, query):
+    return projects_qs.filter(
+        Q(title__icontains=query)
+        | Q(description__icontains=query)
+        | Q(field__icontains=query)
+        | Q(target_role__icontains=query)
+        | Q(tech_preference__icontains=query)
+        | Q(interest_tags__icontains=query)
+    )
+
+
+def search_projects(projects_qs, query):
+    """Return the projects in ``projects_qs`` matching ``query``, best match first.
+
+    On SQLite this uses the FTS5 index (BM25 ranking, prefix matching on every
+    word). Queries with symbols the tokenizer drops, queries the index finds
+    nothing for (e.g. "script" inside "JavaScript") and other databases use
+    the ``icontains`` filter, ordered by field and title.
+    """
+    match = build_match_expression(query)
+    if not match or SYMBOL_RE.search(str(query)) or not search_index_available():
+        return list(_filter_with_orm(projects_qs, query).order_by("field", "title", "id"))
+
+    try:
+        ranked_ids = ranked_project_ids(match)
+    except OperationalError:
+        ranked_ids = []
+    if ranked_ids:
+        position = {project_id: index for index, project_id in enumerate(ranked_ids)}
+        matches = list(projects_qs.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])))
+        if matches:
+            return sorted(matches, key=lambda project: position[project.id])
+    return list(_filter_with_orm(projects_qs, query).order_by("field", "title", "id"))
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .billing_service import invalidate_plan_ids
+from .catalog_version import bump_catalog_version
+from .models import Plan, PremiumRequest, Project, Subscription
+from .query_metrics import install_execute_wrapper
+from .recommendation_service import invalidate_catalog_index
+from .search_service import index_project, unindex_project
+from .subscription_service import invalidate_subscription_tier
+from .workspace_service import forget_workspace, store_workspace
+
+
+# Set by deferred_catalog_changes() to collect changes instead of applying them.
+_deferred_changes = ContextVar("users_deferred_catalog_changes", default=None)
+
+
+def catalog_changed():
+    deferred = _deferred_changes.get()
+    if deferred is not None:
+        deferred[:] = [True]
+        return
+    invalidate_catalog_index()
+    # Rebuild again, and tell other processes, once the write is visible to
+    # other connections.
+    transaction.on_commit(invalidate_catalog_index)
+    transaction.on_commit(bump_catalog_version)
+
+
+@contextmanager
+def deferred_catalog_changes():
+    """Collapse the catalog changes made inside the block into one, at its end."""
+    deferred = []
+    token = _deferred_changes.set(deferred)
+    try:
+        yield
+    finally:
+        _deferred_changes.reset(token)
+        if deferred:
+            catalog_changed()
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    index_project(instance)
+    store_workspace(instance)
+    catalog_changed()
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    unindex_project(instance.pk)
+    forget_workspace(instance.pk)
+    catalog_changed()
+
+
+@receiver([post_save, post_delete], sender=Subscription)
+@receiver([post_save, post_delete], sender=PremiumRequest)
+def subscription_state_changed(sender, instance, **kwargs):
+    invalidate_subscription_tier(instance.user_id)
+    transaction.on_commit(lambda: invalidate_subscription_tier(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Plan)
+def plan_changed(sender, instance, **kwargs):
+    invalidate_plan_ids()
+    transaction.on_commit(invalidate_plan_ids)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_execute_wrapper(connection)
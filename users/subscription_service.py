@@ -0,0 +1,160 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import PremiumRequest, Subscription
+
+
+EXPLORER_TIER = ("explorer", "Explorer")
+
+
+def tier_from_plan_name(plan_name):
+    name = str(plan_name or "").strip().lower()
+    if "yearly" in name:
+        return "pro_yearly"
+    if "pro" in name or "monthly" in name:
+        return "pro_monthly"
+    return "explorer"
+
+
+def approved_request_expiry(approved_request, tier):
+    approved_at = approved_request.reviewed_at or approved_request.requested_at
+    if not approved_at:
+        return None
+    duration_days = 365 if tier == "pro_yearly" else 30
+    return approved_at.date() + timedelta(days=duration_days)
+
+
+def get_active_subscription(user):
+    # Read-only: expired rows are flipped by the expire_subscriptions command,
+    # the end_date filter keeps them out until then.
+    return Subscription.objects.filter(user=user, is_active=True, end_date__gte=timezone.now().date()).select_related("plan").first()
+
+
+async def aget_active_subscription(user):
+    return await Subscription.objects.filter(user=user, is_active=True, end_date__gte=timezone.now().date()).select_related("plan").afirst()
+
+
+def resolve_subscription_tier(user):
+    """Return ``(tier, plan_name, valid_until)`` for ``user``.
+
+    ``valid_until`` is the last day the answer holds, or ``None`` when it
+    only changes through a subscription or premium request write.
+    """
+    active_subscription = get_active_subscription(user)
+    if active_subscription and active_subscription.plan and active_subscription.plan.price > 0:
+        plan_name = active_subscription.plan.name
+        return tier_from_plan_name(plan_name), plan_name, active_subscription.end_date
+
+    approved_request = (
+        PremiumRequest.objects.filter(user=user, status="approved", plan__price__gt=0)
+        .select_related("plan")
+        .order_by("-reviewed_at", "-requested_at", "-id")
+        .first()
+    )
+    if not approved_request or not approved_request.plan:
+        return EXPLORER_TIER + (None,)
+
+    tier = tier_from_plan_name(approved_request.plan.name)
+    expires_at = approved_request_expiry(approved_request, tier)
+    if expires_at is None or expires_at >= timezone.now().date():
+        return tier, approved_request.plan.name, expires_at
+    return EXPLORER_TIER + (None,)
+
+
+def _tier_cache_key(user_id):
+    return f"users:subscription_tier:{user_id}"
+
+
+def _tier_cache_timeout(valid_until):
+    timeout = getattr(settings, "SUBSCRIPTION_TIER_CACHE_TIMEOUT", 60)
+    if valid_until is None:
+        return timeout
+    # Tiers are compared against timezone.now().date(), i.e. UTC dates.
+    expires = datetime.combine(valid_until + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+    return max(1, min(timeout, int((expires - timezone.now()).total_seconds())))
+
+
+def get_user_subscription_tier(user, request=None):
+    """Return ``(tier, plan_name)`` for ``user``.
+
+    The answer is memoized on ``request`` and cached across requests until the
+    subscription or approved request behind it expires (capped by
+    ``SUBSCRIPTION_TIER_CACHE_TIMEOUT``). Subscription and premium request
+    writes drop the cached entry, in other workers too only if CACHES is shared.
+    """
+    if request is not None and getattr(request, "_subscription_tier", None) is not None:
+        return request._subscription_tier
+
+    key = _tier_cache_key(user.pk)
+    result = cache.get(key)
+    if result is None:
+        tier, plan_name, valid_until = resolve_subscription_tier(user)
+        result = (tier, plan_name)
+        cache.set(key, result, _tier_cache_timeout(valid_until))
+    else:
+        result = tuple(result)
+
+    if request is not None:
+        request._subscription_tier = result
+    return result
+
+
+async def aget_user_subscription_tier(user, request=None):
+    if request is not None and getattr(request, "_subscription_tier", None) is not None:
+        return request._subscription_tier
+    return await sync_to_async(get_user_subscription_tier)(user, request=request)
+
+
+def invalidate_subscription_tier(user_id):
+    cache.delete(_tier_cache_key(user_id))
+
+
+def invalidate_subscription_tiers(user_ids):
+    cache.delete_many([_tier_cache_key(user_id) for user_id in user_ids])
+
+
+def get_subscription_tiers(user_ids):
+    """Resolve ``(tier, plan_name)`` for many users with two queries.
+
+    Mirrors ``resolve_subscription_tier``: the newest active paid
+    subscription wins, otherwise the latest approved paid premium request
+    while it has not expired.
+    """
+    today = timezone.now().date()
+    user_ids = list(user_ids)
+    tiers = {}
+
+    subscriptions = (
+        Subscription.objects.filter(user_id__in=user_ids, is_active=True, end_date__gte=today)
+        .select_related("plan")
+        .order_by("user_id", "-start_date", "-id")
+    )
+    checked = set()
+    for subscription in subscriptions:
+        if subscription.user_id in checked:
+            continue
+        checked.add(subscription.user_id)
+        if subscription.plan and subscription.plan.price > 0:
+            tiers[subscription.user_id] = (tier_from_plan_name(subscription.plan.name), subscription.plan.name)
+
+    remaining = [user_id for user_id in user_ids if user_id not in tiers]
+    approved_requests = (
+        PremiumRequest.objects.filter(user_id__in=remaining, status="approved", plan__price__gt=0)
+        .select_related("plan")
+        .order_by("user_id", "-reviewed_at", "-requested_at", "-id")
+    )
+    checked = set()
+    for approved_request in approved_requests:
+        if approved_request.user_id in checked:
+            continue
+        checked.add(approved_request.user_id)
+        tier = tier_from_plan_name(approved_request.plan.name)
+        expires_at = approved_request_expiry(approved_request, tier)
+        if expires_at is None or expires_at >= today:
+            tiers[approved_request.user_id] = (tier, approved_request.plan.name)
+
+    return {user_id: tiers.get(user_id, EXPLORER_TIER) for user_id in user_ids}
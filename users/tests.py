@@ -1,3 +1,1143 @@
-from django.test import TestCase
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import random
+import re
+import tempfile
+import unittest
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.models import Q
+from django.http import HttpResponse
+from django.template import RequestContext, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .billing_service import _premium_requests, aload_billing_state, get_plan_ids
+from .catalog_version import bump_catalog_version, get_catalog_version, read_catalog_version
+from .db_router import REPLICA_ALIAS, ReadReplicaRouter, read_replica
+from .models import CatalogVersion, DailyRecommendationUsage, Plan, PremiumRequest, Project, SavedProject, Subscription, TaskProgress, UserProfile
+from .page_cache import cache_anonymous_page
+from .premium_request_service import approve_premium_requests, get_fallback_plan, reject_premium_requests
+from .project_import import ALL_COLUMNS, content_hash, read_rows, validate_rows
+from .query_metrics import percentile, query_metrics_snapshot, reset_query_metrics
+from .quota_service import _increment_with_update, consume_recommendation_quota, flush_quota_counters
+from .recommendation_service import PLAN_RANK, invalidate_catalog_index, recommend_projects_for_profile, recommend_projects_for_profiles
+from .search_service import _filter_with_orm, search_projects
+from .subscription_service import _tier_cache_key, get_user_subscription_tier
+from .views import _library_projects
+from .workspace_service import WorkspaceCache, get_workspace
+
+
+def make_project(title, **fields):
+    values = {
+        "description": f"Learn by building {title}.",
+        "field": "Web Development",
+        "target_role": "Developer",
+        "skill_level": "beginner",
+        "required_plan": "explorer",
+        "tech_preference": "Python",
+        "learning_goal": "Build a portfolio project",
+        "interest_tags": "web",
+    }
+    values.update(fields)
+    return Project.objects.create(title=title, **values)
+
+
+CATALOG_FIELDS = ["Web Development", "Data Science", "Mobile Apps"]
+CATALOG_TECH = ["Python", "Python, Django", "JavaScript, React", "Kotlin", "SQL"]
+CATALOG_GOALS = ["Build a portfolio project", "Learn APIs", "Prepare for interviews"]
+CATALOG_TAGS = ["web", "api", "data", "ml", "mobile", "ui", "testing"]
+
+
+def make_catalog(size=60, seed=7):
+    """Projects with overlapping fields, stacks and tags, so many score ties."""
+    rng = random.Random(seed)
+    for number in range(size):
+        make_project(
+            # Repeated titles make the id tie-break matter.
+            f"Project {number % 20:02d}",
+            field=rng.choice(CATALOG_FIELDS),
+            skill_level=rng.choice(["beginner", "intermediate"]),
+            required_plan=rng.choice(list(PLAN_RANK)),
+            tech_preference=rng.choice(CATALOG_TECH),
+            learning_goal=rng.choice(CATALOG_GOALS),
+            interest_tags=", ".join(rng.sample(CATALOG_TAGS, rng.randint(1, 3))),
+        )
+
+
+def catalog_profiles():
+    profiles = [
+        UserProfile(field=field, skill_level=skill, tech_preference=tech, learning_goal=goal, interest_tags=tags)
+        for field, skill, tech, goal, tags in [
+            ("Web Development", "beginner", "Python", "Build a portfolio project", "web, api"),
+            ("Data Science", "intermediate", "SQL", "Learn APIs", "data, ml, testing"),
+            ("Mobile Apps", "beginner", "Kotlin", "", "mobile"),
+            ("", "intermediate", "JavaScript", "interviews", ""),
+            ("Web Development", "beginner", "", "", ""),
+        ]
+    ]
+    return profiles
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+class HotQueryIndexTests(TestCase):
+    """The hot filter and ordering paths are answered from an index, not a table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("planner")
+        cls.today = timezone.now().date()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn("USE TEMP B-TREE", plan)
+        for line in plan.splitlines():
+            # "SCAN t USING INDEX i" walks an index in order; a bare "SCAN t" reads the whole table.
+            self.assertIsNone(re.search(r"\bSCAN \w+$", line.strip()), plan)
+
+    def test_catalog_orders_by_field_title_id(self):
+        self.assertUsesIndex(Project.objects.order_by("field", "title", "id"), "users_proj_field_title_idx")
+        self.assertUsesIndex(
+            Project.objects.filter(required_plan="explorer").order_by("field", "title", "id"),
+            "users_proj_plan_field_idx",
+        )
+
+    def test_library_cursor_pages(self):
+        for tier, index_name in (("pro_yearly", "users_proj_library_idx"), ("explorer", "users_proj_plan_library_idx")):
+            with self.subTest(tier=tier):
+                page = (
+                    _library_projects(tier)
+                    .filter(library_field="Web Development")
+                    .filter(Q(title__gt="M") | Q(title="M", id__gt=10))
+                    .order_by("title", "id")[:6]
+                )
+                self.assertUsesIndex(page, index_name)
+
+    def test_active_subscription_lookup(self):
+        queryset = (
+            Subscription.objects.filter(user=self.user, is_active=True, end_date__gte=self.today)
+            .select_related("plan")
+            .order_by("-start_date", "-id")
+        )
+        self.assertIn("users_sub_user_active_idx", queryset.explain())
+
+    def test_expired_subscriptions_sweep(self):
+        expired = Subscription.objects.filter(is_active=True, end_date__lt=self.today)
+        self.assertUsesIndex(expired.order_by("end_date", "id").values_list("id", flat=True)[:500], "users_sub_active_end_idx")
+
+    def test_latest_approved_request(self):
+        queryset = (
+            PremiumRequest.objects.filter(user=self.user, status="approved", plan__price__gt=0)
+            .select_related("plan")
+            .order_by("-reviewed_at", "-requested_at", "-id")
+        )
+        self.assertIn("users_preq_user_status_idx", queryset.explain())
+
+    def test_billing_state_requests(self):
+        self.assertUsesIndex(_premium_requests(self.user), "users_preq_user_requested_idx")
+
+    def test_pending_request_queue(self):
+        self.assertUsesIndex(
+            PremiumRequest.objects.filter(status="pending").order_by("requested_at", "id"),
+            "users_preq_status_idx",
+        )
+
+
+class SearchProjectsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cpp = make_project("Game Engine", tech_preference="C++, OpenGL", interest_tags="games")
+        cls.c = make_project("Embedded Basics", tech_preference="C", interest_tags="hardware")
+        cls.js = make_project("Dashboard", tech_preference="JavaScript, React", interest_tags="frontend")
+        cls.ts = make_project("Typed API", tech_preference="TypeScript, Node", interest_tags="backend", required_plan="pro_monthly")
+        cls.python = make_project("Python Data Pipeline", tech_preference="Python, Pandas", interest_tags="data, python")
+
+    def assertMatchesOrm(self, query, queryset=None):
+        queryset = Project.objects.all() if queryset is None else queryset
+        found = {project.id for project in search_projects(queryset, query)}
+        self.assertEqual(found, {project.id for project in _filter_with_orm(queryset, query)})
+        return found
+
+    def test_symbol_queries_match_like_icontains(self):
+        self.assertEqual(self.assertMatchesOrm("C++"), {self.cpp.id})
+        self.assertEqual(self.assertMatchesOrm("C#"), set())
+
+    def test_substring_queries_fall_back_to_icontains(self):
+        self.assertEqual(self.assertMatchesOrm("script"), {self.js.id, self.ts.id})
+        self.assertEqual(self.assertMatchesOrm("script", Project.objects.filter(required_plan="explorer")), {self.js.id})
+
+    def test_word_queries_are_ranked_and_respect_the_queryset(self):
+        results = search_projects(Project.objects.all(), "python")
+        self.assertEqual(results[0], self.python)
+        self.assertEqual(search_projects(Project.objects.filter(required_plan="pro_monthly"), "python"), [])
+
+
+def orm_recommendations(profile, limit, user_plan_tier):
+    """The ORM filter and scoring the catalog index replaced."""
+
+    def normalize(value):
+        return str(value or "").strip().lower()
+
+    def split_tags(value):
+        return {tag.strip().lower() for tag in str(value or "").split(",") if tag.strip()}
+
+    profile_field = normalize(profile.field)
+    profile_tech = normalize(profile.tech_preference)
+    profile_goal = normalize(profile.learning_goal)
+    profile_tags = split_tags(profile.interest_tags)
+    if not normalize(profile.skill_level):
+        return []
+
+    allowed_tiers = [tier for tier, rank in PLAN_RANK.items() if rank <= PLAN_RANK.get(user_plan_tier, 0)]
+    conditions = []
+    if profile_field:
+        conditions.append(Q(field__iexact=profile.field))
+    if profile_tech:
+        conditions.append(Q(tech_preference__icontains=profile.tech_preference))
+    if profile_goal:
+        conditions.append(Q(learning_goal__icontains=profile.learning_goal))
+    conditions.extend(Q(interest_tags__icontains=tag) for tag in profile_tags)
+
+    projects_qs = Project.objects.filter(skill_level=profile.skill_level, required_plan__in=allowed_tiers)
+    if conditions:
+        candidate_filter = conditions[0]
+        for condition in conditions[1:]:
+            candidate_filter |= condition
+        projects_qs = projects_qs.filter(candidate_filter)
+
+    scored = []
+    for project in projects_qs:
+        score = 4
+        if profile_field and normalize(project.field) == profile_field:
+            score += 4
+        project_tech = normalize(project.tech_preference)
+        if profile_tech and (profile_tech in project_tech or project_tech in profile_tech):
+            score += 3
+        project_goal = normalize(project.learning_goal)
+        if profile_goal and (profile_goal in project_goal or project_goal in profile_goal):
+            score += 2
+        score += len(profile_tags & split_tags(project.interest_tags)) * 2
+        scored.append((score, project))
+    scored.sort(key=lambda item: (-item[0], item[1].title.lower(), item[1].id))
+    return [(project.id, score) for score, project in scored[:limit]]
+
+
+class CatalogIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_catalog()
+
+    def setUp(self):
+        # The index is process-wide; never reuse one built for another test's rows.
+        invalidate_catalog_index()
+        self.addCleanup(invalidate_catalog_index)
+
+    def ranked(self, profile, limit=10, tier="explorer"):
+        return [(item["id"], item["relevance_score"]) for item in recommend_projects_for_profile(profile, limit, tier)]
+
+    def test_matches_orm_scoring(self):
+        for profile in catalog_profiles():
+            for tier in PLAN_RANK:
+                with self.subTest(field=profile.field, tech=profile.tech_preference, tier=tier):
+                    self.assertEqual(self.ranked(profile, 10, tier), orm_recommendations(profile, 10, tier))
+
+    def test_project_save_and_delete_refresh_the_index(self):
+        profile = catalog_profiles()[0]
+        self.ranked(profile)
+        project = make_project(
+            "A Perfect Match",
+            tech_preference="Python",
+            learning_goal="Build a portfolio project",
+            interest_tags="web, api",
+        )
+        self.assertEqual(self.ranked(profile)[0], (project.id, 17))
+
+        project.required_plan = "pro_yearly"
+        project.save()
+        self.assertNotIn(project.id, dict(self.ranked(profile)))
+        self.assertEqual(self.ranked(profile, tier="pro_yearly")[0], (project.id, 17))
+
+        project.delete()
+        self.assertNotIn(project.id, dict(self.ranked(profile, tier="pro_yearly")))
+        self.assertEqual(self.ranked(profile), orm_recommendations(profile, 10, "explorer"))
+
+    def test_profile_batches_rebuild_an_index_built_for_an_older_version(self):
+        profile = catalog_profiles()[0]
+        profile.user_id = 1
+        recommend_projects_for_profiles([profile], {}, 10, catalog_version=read_catalog_version())
+
+        # A write made by another process only shows up as a new catalog version.
+        with mock.patch("users.signals.invalidate_catalog_index"):
+            project = make_project(
+                "A Perfect Match",
+                tech_preference="Python",
+                learning_goal="Build a portfolio project",
+                interest_tags="web, api",
+            )
+        bump_catalog_version()
+
+        results = recommend_projects_for_profiles([profile], {}, 10, catalog_version=read_catalog_version())
+        self.assertEqual((results[1][0]["id"], results[1][0]["relevance_score"]), (project.id, 17))
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+class NumpyEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_catalog(size=120, seed=11)
+
+    def setUp(self):
+        invalidate_catalog_index()
+        self.addCleanup(invalidate_catalog_index)
+
+    def test_same_output_as_python_engine(self):
+        for profile in catalog_profiles():
+            for tier in PLAN_RANK:
+                for limit in (1, 6, 50):
+                    with self.subTest(field=profile.field, tech=profile.tech_preference, tier=tier, limit=limit):
+                        with override_settings(RECOMMENDATION_ENGINE="python"):
+                            expected = recommend_projects_for_profile(profile, limit, tier)
+                        with override_settings(RECOMMENDATION_ENGINE="numpy"):
+                            actual = recommend_projects_for_profile(profile, limit, tier)
+                        self.assertEqual(actual, expected)
+                        allowed = {plan for plan, rank in PLAN_RANK.items() if rank <= PLAN_RANK[tier]}
+                        self.assertTrue({item["required_plan"] for item in actual} <= allowed)
+
+
+class RecommendationQuotaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("quota")
+        cls.today = timezone.localdate()
+
+    def setUp(self):
+        cache.clear()
+        flush_quota_counters()
+
+    def stored_count(self):
+        return DailyRecommendationUsage.objects.filter(user=self.user, usage_date=self.today).values_list("count", flat=True).first()
+
+    def test_limit_is_enforced_at_the_boundary(self):
+        results = [consume_recommendation_quota(self.user, 3, self.today) for _ in range(5)]
+        self.assertEqual(results, [(1, False), (2, False), (3, False), (3, True), (3, True)])
+        self.assertEqual(self.stored_count(), 3)
+
+    def test_increment_is_one_statement_on_the_current_row(self):
+        DailyRecommendationUsage.objects.create(user=self.user, usage_date=self.today, count=1)
+        # Another worker counted a run since this one last looked.
+        DailyRecommendationUsage.objects.filter(user=self.user).update(count=2)
+        with self.assertNumQueries(1):
+            self.assertEqual(consume_recommendation_quota(self.user, 3, self.today), (3, False))
+        with self.assertNumQueries(1):
+            self.assertEqual(consume_recommendation_quota(self.user, 3, self.today), (3, True))
+        self.assertEqual(self.stored_count(), 3)
+
+    def test_update_fallback_matches_upsert(self):
+        results = [_increment_with_update(self.user.pk, self.today, 2) for _ in range(3)]
+        self.assertEqual(results, [1, 2, None])
+        self.assertEqual(self.stored_count(), 2)
+
+    @override_settings(
+        RECOMMENDATION_QUOTA_CACHE=True,
+        RECOMMENDATION_QUOTA_FLUSH_SIZE=100,
+        RECOMMENDATION_QUOTA_FLUSH_INTERVAL=3600,
+    )
+    def test_cached_counts_reach_the_table_on_flush(self):
+        DailyRecommendationUsage.objects.create(user=self.user, usage_date=self.today, count=1)
+        results = [consume_recommendation_quota(self.user, 3, self.today) for _ in range(3)]
+        self.assertEqual(results, [(2, False), (3, False), (3, True)])
+        self.assertEqual(self.stored_count(), 1)
+
+        self.assertEqual(flush_quota_counters(), 1)
+        self.assertEqual(self.stored_count(), 3)
+
+    @override_settings(RECOMMENDATION_QUOTA_CACHE=True, RECOMMENDATION_QUOTA_FLUSH_SIZE=1)
+    def test_flush_size_triggers_a_write(self):
+        consume_recommendation_quota(self.user, 3, self.today)
+        self.assertEqual(self.stored_count(), 1)
+
+
+class SessionWorkspaceImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("saver")
+        cls.project = make_project("Portfolio Site")
+        cls.phases = [
+            {"title": "Plan", "tasks": [{"id": 1, "title": "Sketch"}, {"id": 2, "title": "Outline"}]},
+            {"title": "Build", "tasks": [{"id": 3, "title": "Code"}]},
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def seed_session(self):
+        session = self.client.session
+        session["my_projects"] = {
+            f"catalog-{self.project.pk}": {
+                "source": "catalog",
+                "project_pk": self.project.pk,
+                "title": self.project.title,
+                "category": self.project.field,
+                "difficulty": "beginner",
+            },
+            "rec-0": {"source": "recommendation", "index": 0, "project_pk": 999999, "title": "Gone"},
+        }
+        session[f"phases_catalog-{self.project.pk}"] = self.phases
+        # Task 99 no longer exists in the phases and must be dropped.
+        session[f"progress_catalog-{self.project.pk}"] = [1, 3, 99]
+        session.save()
+
+    def saved_state(self):
+        return [
+            (saved.key, saved.project_id, saved.total_tasks, saved.completed_tasks, sorted(saved.task_progress.values_list("task_id", flat=True)))
+            for saved in SavedProject.objects.filter(user=self.user).order_by("key")
+        ]
+
+    def test_session_workspaces_move_to_the_database(self):
+        self.seed_session()
+        self.assertEqual(self.client.get("/my-projects/").status_code, 200)
+        self.assertEqual(
+            self.saved_state(),
+            [(f"catalog-{self.project.pk}", self.project.pk, 3, 2, [1, 3]), ("rec-0", None, 0, 0, [])],
+        )
+        session = self.client.session
+        self.assertNotIn("my_projects", session)
+        self.assertNotIn(f"progress_catalog-{self.project.pk}", session)
+
+    def test_importing_twice_is_idempotent(self):
+        self.seed_session()
+        self.client.get("/my-projects/")
+        first = self.saved_state()
+        # A second device still holding the old session data.
+        self.seed_session()
+        self.client.get("/my-projects/")
+        self.assertEqual(self.saved_state(), first)
+        self.assertEqual(TaskProgress.objects.filter(saved_project__user=self.user).count(), 2)
+
+    def test_opening_a_workspace_twice_saves_it_once(self):
+        url = f"/projects/{self.project.pk}/start/"
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        saved = SavedProject.objects.get(user=self.user)
+        self.assertEqual(saved.key, f"catalog-{self.project.pk}")
+
+        task_id = saved.phases[0]["tasks"][0]["id"]
+        self.client.post(url, {"task": [task_id]})
+        self.client.post(url, {"task": [task_id]})
+        saved.refresh_from_db()
+        self.assertEqual(saved.completed_tasks, 1)
+        self.assertEqual(list(saved.task_progress.values_list("task_id", flat=True)), [task_id])
+
+
+def import_row(title, **fields):
+    row = {column: "" for column in ALL_COLUMNS}
+    row.update(
+        {
+            "title": title,
+            "description": f"Build {title}.",
+            "field": "Web Development",
+            "target_role": "Developer",
+            "skill_level": "Beginner",
+            "required_plan": "free",
+            "tech_preference": "Python, Django",
+            "learning_goal": "Ship a project",
+            "interest_tags": "web, api",
+        }
+    )
+    row.update(fields)
+    return row
+
+
+class ImportCommandTestCase(TestCase):
+    """Runs import_projects_csv on files in a temporary directory."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp = Path(tmp_dir.name)
+
+    def write_csv(self, name, rows, opener=open):
+        path = self.tmp / name
+        with opener(path, "wt", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=ALL_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path, **options):
+        out = io.StringIO()
+        call_command("import_projects_csv", str(path), stdout=out, stderr=io.StringIO(), **options)
+        return out.getvalue().splitlines()[-1]
+
+    def stored_projects(self):
+        return list(Project.objects.order_by("title").values_list("title", "description", "required_plan", "content_hash", "match_tokens"))
+
+
+class BulkImportTests(ImportCommandTestCase):
+    def test_bulk_batches_match_row_by_row_import(self):
+        path = self.write_csv("feed.csv", [import_row(f"Project {index}", required_plan=["free", "monthly"][index % 2]) for index in range(5)])
+        self.assertIn("created=5", self.run_import(path))
+        row_by_row = self.stored_projects()
+        Project.objects.all().delete()
+
+        self.assertIn("created=5", self.run_import(path, bulk=True, batch_size=2))
+        self.assertEqual(self.stored_projects(), row_by_row)
+        self.assertEqual(search_projects(Project.objects.all(), "project"), list(Project.objects.order_by("id")))
+
+    def test_bulk_update_existing(self):
+        rows = [import_row("Chat App"), import_row("Blog")]
+        path = self.write_csv("feed.csv", rows)
+        self.run_import(path, bulk=True)
+        rows[0]["description"] = "A rewritten description."
+        self.write_csv("feed.csv", rows)
+        self.run_import(path, bulk=True, update_existing=True)
+        self.assertEqual(Project.objects.get(title="Chat App").description, "A rewritten description.")
+        self.assertEqual(Project.objects.count(), 2)
+
+    def test_existing_rows_are_skipped_without_update_existing(self):
+        path = self.write_csv("feed.csv", [import_row("Chat App")])
+        self.run_import(path, bulk=True)
+        summary = self.run_import(path, bulk=True)
+        self.assertIn("created=0 updated=0", summary)
+        self.assertIn("skipped=1", summary)
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_csv("feed.csv", [import_row("Chat App"), import_row("Chat App")])
+        summary = self.run_import(path, bulk=True, dry_run=True)
+        self.assertIn("created=1 updated=0", summary)
+        self.assertIn("skipped=1", summary)
+        self.assertFalse(Project.objects.exists())
+
+
+class StreamingImportTests(ImportCommandTestCase):
+    def test_rejected_rows_are_written_to_the_error_file(self):
+        path = self.write_csv("feed.csv", [import_row("Chat App"), import_row("Blog", skill_level="expert"), import_row("", field="Data")])
+        with self.assertRaisesMessage(CommandError, "Import finished with errors"):
+            self.run_import(path)
+        self.assertTrue(Project.objects.filter(title="Chat App").exists())
+
+        with open(f"{path}.errors.csv", encoding="utf-8", newline="") as f:
+            rejected = list(csv.DictReader(f))
+        self.assertEqual([row["row_number"] for row in rejected], ["3", "4"])
+        self.assertIn("expert", rejected[0]["error"])
+        self.assertEqual((rejected[0]["title"], rejected[1]["field"]), ("Blog", "Data"))
+
+    def test_no_error_file_without_rejections(self):
+        path = self.write_csv("feed.csv", [import_row("Chat App")])
+        self.run_import(path)
+        self.assertFalse(Path(f"{path}.errors.csv").exists())
+
+    def test_worker_processes_import_the_same_rows(self):
+        path = self.write_csv("feed.csv", [import_row(f"Project {index}") for index in range(7)] + [import_row("Bad", skill_level="guru")])
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+        serial = self.stored_projects()
+        Project.objects.all().delete()
+        with self.assertRaises(CommandError):
+            self.run_import(path, workers=2, chunk_size=3)
+        self.assertEqual(self.stored_projects(), serial)
+
+
+class ValidateRowsTests(unittest.TestCase):
+    def rows(self):
+        lines = io.StringIO()
+        writer = csv.DictWriter(lines, fieldnames=ALL_COLUMNS)
+        writer.writeheader()
+        for number in range(40):
+            if number % 7 == 3:
+                writer.writerow(import_row(f"Bad {number}", skill_level="guru"))
+            elif number % 11 == 5:
+                writer.writerow(import_row("", field="Missing title"))
+            else:
+                writer.writerow(import_row(f"Project {number}", required_plan=["free", "monthly", "yearly"][number % 3]))
+        lines.seek(0)
+        return read_rows(csv.DictReader(lines))
+
+    def test_process_pool_matches_serial_validation(self):
+        serial = list(validate_rows(self.rows(), workers=1, chunk_size=4))
+        pooled = list(validate_rows(self.rows(), workers=3, chunk_size=4))
+        self.assertEqual(pooled, serial)
+        self.assertEqual([row_index for row_index, *_ in pooled], list(range(2, 42)))
+        self.assertEqual(sum(1 for *_, error in pooled if error), 9)
+
+
+class ContentHashImportTests(ImportCommandTestCase):
+    def test_bulk_update_skips_unchanged_rows(self):
+        rows = [import_row("Chat App"), import_row("Blog")]
+        path = self.write_csv("feed.csv", rows)
+        self.assertIn("created=2 updated=0 unchanged=0", self.run_import(path, bulk=True))
+        chat = Project.objects.get(title="Chat App")
+        self.assertEqual(chat.content_hash, chat.compute_content_hash())
+
+        with self.assertNumQueries(1):
+            summary = self.run_import(path, bulk=True, update_existing=True)
+        self.assertIn("created=0 updated=0 unchanged=2", summary)
+
+        rows[0]["description"] = "A rewritten description."
+        self.write_csv("feed.csv", rows)
+        self.assertIn("created=0 updated=1 unchanged=1", self.run_import(path, bulk=True, update_existing=True))
+        chat.refresh_from_db()
+        self.assertEqual(chat.description, "A rewritten description.")
+        self.assertEqual(chat.content_hash, content_hash({column: getattr(chat, column) for column in ALL_COLUMNS}))
+        self.assertEqual(search_projects(Project.objects.all(), "rewritten"), [chat])
+
+    def test_row_by_row_update_skips_unchanged_rows(self):
+        path = self.write_csv("feed.csv", [import_row("Chat App"), import_row("Blog")])
+        self.run_import(path)
+        with self.assertNumQueries(2):
+            summary = self.run_import(path, update_existing=True)
+        self.assertIn("created=0 updated=0 unchanged=2", summary)
+
+    def test_row_by_row_import_changes_the_catalog_once(self):
+        self.run_import(self.write_csv("feed.csv", [import_row("Old Course")]))
+        path = self.write_csv("feed.csv", [import_row(f"Project {index}") for index in range(5)])
+        version = read_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIn("created=5", self.run_import(path, prune=True))
+        self.assertEqual(read_catalog_version(), version + 1)
+
+    def test_prune_deletes_projects_missing_from_the_file(self):
+        self.run_import(self.write_csv("feed.csv", [import_row("Chat App"), import_row("Blog"), import_row("Old Course")]))
+        path = self.write_csv("feed.csv", [import_row("Chat App"), import_row("Blog")])
+
+        self.assertIn("pruned=1", self.run_import(path, prune=True, dry_run=True))
+        self.assertEqual(Project.objects.count(), 3)
+
+        self.assertIn("pruned=1", self.run_import(path, prune=True, update_existing=True))
+        self.assertEqual(sorted(Project.objects.values_list("title", flat=True)), ["Blog", "Chat App"])
+        self.assertEqual(search_projects(Project.objects.all(), "old course"), [])
+
+    def test_prune_is_skipped_when_rows_are_rejected(self):
+        self.run_import(self.write_csv("feed.csv", [import_row("Chat App"), import_row("Blog")]))
+        path = self.write_csv("feed.csv", [import_row("Chat App"), import_row("Blog", skill_level="guru")])
+        with self.assertRaises(CommandError):
+            self.run_import(path, prune=True, update_existing=True)
+        self.assertEqual(Project.objects.count(), 2)
+
+
+class ImportFormatTests(ImportCommandTestCase):
+    def test_gzipped_jsonl(self):
+        path = self.tmp / "feed.jsonl.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({**import_row("Chat App"), "interest_tags": ["web", "realtime"], "task_checklist": ["Design", "Build"]}) + "\n")
+            f.write("\n")
+            f.write(json.dumps(import_row("Blog", required_plan="yearly", skill_level="ADVANCED")) + "\n")
+
+        self.assertIn("created=2", self.run_import(path))
+        chat = Project.objects.get(title="Chat App")
+        self.assertEqual((chat.interest_tags, chat.task_checklist), ("web, realtime", "Design\nBuild"))
+        blog = Project.objects.get(title="Blog")
+        self.assertEqual((blog.required_plan, blog.skill_level), ("pro_yearly", "advanced"))
+
+    def test_gzipped_csv_matches_plain_csv(self):
+        rows = [import_row("Chat App"), import_row("Blog")]
+        self.run_import(self.write_csv("feed.csv.gz", rows, opener=gzip.open))
+        compressed = list(Project.objects.order_by("title").values_list("title", "required_plan", "content_hash"))
+        Project.objects.all().delete()
+        self.run_import(self.write_csv("feed.csv", rows))
+        self.assertEqual(list(Project.objects.order_by("title").values_list("title", "required_plan", "content_hash")), compressed)
+
+    def test_invalid_json_lines_are_rejected(self):
+        path = self.tmp / "feed.jsonl"
+        path.write_text(json.dumps(import_row("Chat App")) + "\n{not json\n[1, 2]\n", encoding="utf-8")
+        with self.assertRaisesMessage(CommandError, "Import finished with errors"):
+            self.run_import(path)
+        self.assertEqual(list(Project.objects.values_list("title", flat=True)), ["Chat App"])
+        with open(f"{path}.errors.csv", encoding="utf-8", newline="") as f:
+            self.assertEqual([row["row_number"] for row in csv.DictReader(f)], ["2", "3"])
+
+
+class PremiumRequestApprovalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.monthly, _ = Plan.objects.update_or_create(name="Pro Monthly", defaults={"price": 10})
+        cls.yearly, _ = Plan.objects.update_or_create(name="Pro Yearly", defaults={"price": 100})
+        cls.free, _ = Plan.objects.update_or_create(name="Free", defaults={"price": 0})
+        cls.today = timezone.now().date()
+
+    def setUp(self):
+        cache.clear()
+
+    def make_requests(self, count, plan=None, prefix="member"):
+        User.objects.bulk_create([User(username=f"{prefix}-{index}") for index in range(count)])
+        users = list(User.objects.filter(username__startswith=f"{prefix}-").order_by("id"))
+        PremiumRequest.objects.bulk_create([PremiumRequest(user=user, plan=plan) for user in users])
+        return users
+
+    def test_approval_replaces_active_subscriptions(self):
+        yearly_user, fallback_user = self.make_requests(1, self.yearly, "yearly") + self.make_requests(1, self.free, "free")
+        old = Subscription.objects.create(user=yearly_user, plan=self.monthly, end_date=self.today + timezone.timedelta(days=5))
+        self.assertEqual(get_user_subscription_tier(yearly_user)[0], "pro_monthly")
+
+        self.assertEqual(approve_premium_requests(PremiumRequest.objects.all(), get_fallback_plan()), 2)
+
+        old.refresh_from_db()
+        self.assertFalse(old.is_active)
+        active = {sub.user_id: sub for sub in Subscription.objects.filter(is_active=True)}
+        self.assertEqual(set(active), {yearly_user.id, fallback_user.id})
+        self.assertEqual((active[yearly_user.id].plan, active[yearly_user.id].end_date), (self.yearly, self.today + timezone.timedelta(days=365)))
+        # Unpaid plans fall back to Pro Monthly.
+        self.assertEqual((active[fallback_user.id].plan, active[fallback_user.id].end_date), (self.monthly, self.today + timezone.timedelta(days=30)))
+        self.assertFalse(PremiumRequest.objects.exclude(status="approved").exists())
+        self.assertFalse(PremiumRequest.objects.filter(reviewed_at__isnull=True).exists())
+        # The cached tier was dropped even though no model signal fired.
+        self.assertEqual(get_user_subscription_tier(yearly_user)[0], "pro_yearly")
+
+    def test_rejection(self):
+        users = self.make_requests(3, self.monthly)
+        self.assertEqual(reject_premium_requests(PremiumRequest.objects.all()), 3)
+        self.assertEqual(set(PremiumRequest.objects.values_list("status", flat=True)), {"rejected"})
+        self.assertFalse(Subscription.objects.filter(user__in=users).exists())
+
+    def test_reviewed_requests_are_skipped(self):
+        approved_user, rejected_user, pending_user = self.make_requests(3, self.monthly)
+        reviewed_at = timezone.now() - timezone.timedelta(days=3)
+        PremiumRequest.objects.filter(user=approved_user).update(status="approved", reviewed_at=reviewed_at)
+        PremiumRequest.objects.filter(user=rejected_user).update(status="rejected", reviewed_at=reviewed_at)
+
+        self.assertEqual(approve_premium_requests(PremiumRequest.objects.all(), self.monthly), 1)
+        self.assertEqual(reject_premium_requests(PremiumRequest.objects.all()), 0)
+        self.assertEqual(list(Subscription.objects.values_list("user_id", flat=True)), [pending_user.id])
+        self.assertEqual(PremiumRequest.objects.get(user=rejected_user).status, "rejected")
+        self.assertEqual(PremiumRequest.objects.get(user=approved_user).reviewed_at, reviewed_at)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        self.make_requests(5, self.monthly, "small")
+        self.make_requests(50, self.yearly, "large")
+        # Savepoint, select, deactivate, insert, update, release.
+        with self.assertNumQueries(6):
+            self.assertEqual(approve_premium_requests(PremiumRequest.objects.filter(user__username__startswith="small-"), self.monthly), 5)
+        with self.assertNumQueries(6):
+            self.assertEqual(approve_premium_requests(PremiumRequest.objects.filter(user__username__startswith="large-"), self.monthly), 50)
+
+    def test_command_clears_the_backlog_in_batches(self):
+        self.make_requests(5, self.monthly)
+        out = io.StringIO()
+        call_command("approve_premium_requests", "--dry-run", stdout=out)
+        self.assertIn("pending=5", out.getvalue())
+
+        out = io.StringIO()
+        call_command("approve_premium_requests", "--batch-size", "2", "--limit", "3", stdout=out)
+        self.assertIn("approved=3 batches=2", out.getvalue())
+        call_command("approve_premium_requests", "--batch-size", "2", stdout=out)
+        self.assertIn("approved=2 batches=1", out.getvalue())
+        self.assertEqual(Subscription.objects.filter(is_active=True).count(), 5)
+
+
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_is_seen_at_once_in_this_process(self):
+        before = get_catalog_version()
+        bump_catalog_version()
+        self.assertEqual(get_catalog_version(), before + 1)
+
+    def test_other_workers_bumps_are_seen_after_the_timeout(self):
+        bump_catalog_version()
+        cached = get_catalog_version()
+        # A bump made by another worker only changes the table.
+        CatalogVersion.objects.filter(pk=1).update(version=cached + 1)
+        self.assertEqual(get_catalog_version(), cached)
+        with override_settings(CATALOG_VERSION_CACHE_TIMEOUT=0):
+            cache.clear()
+            self.assertEqual(get_catalog_version(), cached + 1)
+            CatalogVersion.objects.filter(pk=1).update(version=cached + 2)
+            self.assertEqual(get_catalog_version(), cached + 2)
+
+
+class ProjectLibraryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("reader", password="pw")
+        # Raw field spellings that share a library section.
+        for index, field in enumerate(["Web Development", " Web Development", "Web Development  ", "Web Development"] * 2):
+            make_project(f"Web {index}", field=field)
+        for index, field in enumerate(["", "   ", "General"]):
+            make_project(f"Misc {index}", field=field)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def load_section(self, group):
+        titles = [project["title"] for project in group["projects"]]
+        cursor = group["next_cursor"]
+        while cursor:
+            response = self.client.get(reverse("project_library_more"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            titles += re.findall(r"<h3>(.*?)</h3>", data["html"])
+            cursor = data["next_cursor"]
+        return titles
+
+    def test_sections_page_through_every_field_spelling(self):
+        response = self.client.get(reverse("project_library"))
+        groups = {group["name"]: group for group in response.context["library_groups"]}
+        self.assertEqual(list(groups), ["General", "Web Development"])
+        # Explorers see two cards per section before "load more".
+        self.assertEqual([len(group["projects"]) for group in groups.values()], [2, 2])
+        self.assertEqual((groups["General"]["total"], groups["Web Development"]["total"]), (3, 8))
+
+        self.assertEqual(self.load_section(groups["Web Development"]), [f"Web {index}" for index in range(8)])
+        self.assertEqual(self.load_section(groups["General"]), [f"Misc {index}" for index in range(3)])
+
+    def test_tabs_and_newlines_around_the_field_are_stripped(self):
+        project = make_project("Web Tabbed", field="\tWeb Development\n")
+        project.refresh_from_db()
+        self.assertEqual((project.field, project.library_field), ("Web Development", "Web Development"))
+
+        library = self.client.get(reverse("project_library")).context["library_groups"]
+        self.assertEqual([group["name"] for group in library], ["General", "Web Development"])
+        catalog = self.client.get(reverse("projects")).context["listing"].groups
+        self.assertEqual([group["name"] for group in catalog], ["General", "Web Development"])
+        self.assertIn("Web Tabbed", [card["title"] for card in catalog[1]["projects"]])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("project_library_more"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ReadReplicaRouterTests(unittest.TestCase):
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+        patcher = mock.patch.dict(connections.databases, {REPLICA_ALIAS: {}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_aliases(self, request=None):
+        return [self.router.db_for_read(model) for model in (Project, Plan, Subscription, UserProfile)]
+
+    def test_catalog_reads_in_replica_views_use_the_replica(self):
+        self.assertEqual(self.read_aliases(), [None, None, None, None])
+        self.assertEqual(read_replica(self.read_aliases)(None), [REPLICA_ALIAS, REPLICA_ALIAS, None, None])
+        # The flag does not outlive the view.
+        self.assertEqual(self.read_aliases(), [None, None, None, None])
+
+    def test_async_views(self):
+        async def view(request):
+            return self.read_aliases()
+
+        self.assertEqual(async_to_sync(read_replica(view))(None), [REPLICA_ALIAS, REPLICA_ALIAS, None, None])
+        self.assertEqual(self.read_aliases(), [None, None, None, None])
+
+    def test_writes_and_migrations_stay_on_the_primary(self):
+        self.assertEqual(read_replica(lambda request: self.router.db_for_write(Project))(None), "default")
+        self.assertFalse(self.router.allow_migrate(REPLICA_ALIAS, "users"))
+        self.assertIsNone(self.router.allow_migrate("default", "users"))
+
+    def test_no_replica_configured(self):
+        del connections.databases[REPLICA_ALIAS]
+        self.assertEqual(read_replica(self.read_aliases)(None), [None, None, None, None])
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def get(self, view, path="/", user=None):
+        request = RequestFactory().get(path)
+        request.user = user or AnonymousUser()
+        request.session = SessionStore()
+
+        async def auser():
+            return request.user
+
+        request.auser = auser
+        if iscoroutinefunction(view):
+            return async_to_sync(view)(request)
+        return view(request)
+
+    def page(self, body=None):
+        @cache_anonymous_page("test", query_params=("q",))
+        def view(request):
+            self.calls += 1
+            response = HttpResponse(f"{self.calls}:{request.GET.get('q', '')}")
+            if body:
+                body(request, response)
+            return response
+
+        return view
+
+    def test_pages_are_cached_per_query_and_catalog_version(self):
+        view = self.page()
+        self.assertEqual(self.get(view, "/?q=python").content, b"1:python")
+        self.assertEqual(self.get(view, "/?q=python&utm=x").content, b"1:python")
+        self.assertEqual(self.get(view, "/?q=django").content, b"2:django")
+        bump_catalog_version()
+        self.assertEqual(self.get(view, "/?q=python").content, b"3:python")
+
+    def test_visitor_specific_responses_are_not_stored(self):
+        bodies = {
+            "cookie": lambda request, response: response.set_cookie("theme", "dark"),
+            "csrf": lambda request, response: response.write(Template("{% csrf_token %}").render(RequestContext(request))),
+            "session": lambda request, response: request.session.__setitem__("seen", True),
+        }
+        for name, body in bodies.items():
+            with self.subTest(name):
+                view = self.page(body)
+                self.get(view)
+                self.get(view)
+        self.assertEqual(self.calls, 6)
+
+    def test_logged_in_users_and_disabled_cache_bypass_it(self):
+        view = self.page()
+        self.get(view, user=User(username="member"))
+        self.get(view, user=User(username="member"))
+        with override_settings(PAGE_CACHE_TIMEOUT=0):
+            self.get(view)
+            self.get(view)
+        self.assertEqual(self.calls, 4)
+
+    def test_async_views(self):
+        @cache_anonymous_page("test-async")
+        async def view(request):
+            self.calls += 1
+            return HttpResponse(str(self.calls))
+
+        self.assertEqual(self.get(view).content, b"1")
+        self.assertEqual(self.get(view).content, b"1")
+        self.assertEqual(self.get(view, user=User(username="member")).content, b"2")
+
+
+@override_settings(QUERY_METRICS_SAMPLE_RATE=1)
+class QueryMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user("member", password="pw")
+        cls.staff = User.objects.create_user("operator", password="pw", is_staff=True)
+        for index in range(3):
+            make_project(f"Project {index}")
+
+    def setUp(self):
+        reset_query_metrics()
+        self.addCleanup(reset_query_metrics)
+
+    def test_sampled_requests_report_their_queries(self):
+        self.client.force_login(self.member)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("project_library"))
+        self.assertGreater(len(queries), 0)
+        self.assertIn(f'desc="{len(queries)} queries"', response["Server-Timing"])
+
+        summary = query_metrics_snapshot()["project_library"]
+        self.assertEqual((summary["requests"], summary["queries"]["max"]), (1, len(queries)))
+
+    @override_settings(QUERY_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_recorded(self):
+        response = self.client.get(reverse("resources"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(query_metrics_snapshot(), {})
+
+    def test_ops_endpoint_is_staff_only_and_post_clears_it(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(reverse("query_metrics")).status_code, 302)
+
+        self.client.force_login(self.staff)
+        self.client.get(reverse("resources"))
+        self.assertIn("resources", self.client.get(reverse("query_metrics")).json()["views"])
+        self.client.post(reverse("query_metrics"))
+        # The POST itself is the only request left in the window.
+        self.assertEqual(list(query_metrics_snapshot()), ["query_metrics"])
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 11))
+        self.assertEqual([percentile(values, pct) for pct in (1, 50, 95, 100)], [1, 5, 10, 10])
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+class SubscriptionTierCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("subscriber")
+        cls.monthly, _ = Plan.objects.update_or_create(name="Pro Monthly", defaults={"price": 10})
+        cls.yearly, _ = Plan.objects.update_or_create(name="Pro Yearly", defaults={"price": 100})
+        cls.today = timezone.now().date()
+
+    def setUp(self):
+        cache.clear()
+
+    def tier(self):
+        return get_user_subscription_tier(self.user)[0]
+
+    def test_subscription_writes_drop_the_cached_tier(self):
+        self.assertEqual(self.tier(), "explorer")
+        subscription = Subscription.objects.create(user=self.user, plan=self.yearly, end_date=self.today + timezone.timedelta(days=30))
+        self.assertEqual(self.tier(), "pro_yearly")
+        subscription.plan = self.monthly
+        subscription.save()
+        self.assertEqual(self.tier(), "pro_monthly")
+        subscription.delete()
+        self.assertEqual(self.tier(), "explorer")
+
+    def test_premium_request_reviews_drop_the_cached_tier(self):
+        premium_request = PremiumRequest.objects.create(user=self.user, plan=self.monthly)
+        self.assertEqual(self.tier(), "explorer")
+        premium_request.status = "approved"
+        premium_request.reviewed_at = timezone.now()
+        premium_request.save()
+        self.assertEqual(self.tier(), "pro_monthly")
+        premium_request.status = "rejected"
+        premium_request.save()
+        self.assertEqual(self.tier(), "explorer")
+
+    def test_ttl_is_capped_at_the_end_date(self):
+        Subscription.objects.create(user=self.user, plan=self.monthly, end_date=self.today)
+        midnight = datetime.combine(self.today + timezone.timedelta(days=1), datetime.min.time(), tzinfo=dt_timezone.utc)
+        with override_settings(SUBSCRIPTION_TIER_CACHE_TIMEOUT=7 * 24 * 3600), mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.assertEqual(self.tier(), "pro_monthly")
+        key, value, ttl = cache_set.call_args.args
+        self.assertEqual((key, tuple(value)), (_tier_cache_key(self.user.pk), ("pro_monthly", "Pro Monthly")))
+        # Expires when the subscription's last day ends, not a week later.
+        self.assertLessEqual(ttl, (midnight - timezone.now()).total_seconds() + 1)
+
+    def test_ttl_without_an_end_date_is_the_setting(self):
+        with override_settings(SUBSCRIPTION_TIER_CACHE_TIMEOUT=42), mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.assertEqual(self.tier(), "explorer")
+        self.assertEqual(cache_set.call_args.args[2], 42)
+
+
+class HomeBillingStateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("customer", password="pw")
+        cls.monthly, _ = Plan.objects.update_or_create(name="Pro Monthly", defaults={"price": 10})
+        cls.yearly, _ = Plan.objects.update_or_create(name="Pro Yearly", defaults={"price": 100})
+        today = timezone.now().date()
+        cls.subscription = Subscription.objects.create(user=cls.user, plan=cls.monthly, end_date=today + timezone.timedelta(days=10))
+        cls.approved = PremiumRequest.objects.create(user=cls.user, plan=cls.monthly, status="approved", reviewed_at=timezone.now())
+        cls.pending = PremiumRequest.objects.create(user=cls.user, plan=cls.yearly)
+
+    def setUp(self):
+        get_plan_ids()
+
+    def test_billing_state_takes_two_queries(self):
+        with self.assertNumQueries(2):
+            billing = async_to_sync(aload_billing_state)(self.user)
+        self.assertEqual(
+            (billing.active_plan_id, billing.pending_plan_id, billing.approved_plan_id, billing.premium_request),
+            (self.monthly.id, self.yearly.id, self.monthly.id, self.pending),
+        )
+
+    def test_home_page_queries(self):
+        self.client.force_login(self.user)
+        # Session, user, then the subscription and premium requests.
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("home"))
+        self.assertEqual((response.context["active_plan_id"], response.context["pending_plan_id"]), (self.monthly.id, self.yearly.id))
+
+
+class WorkspaceCacheTests(TestCase):
+    def setUp(self):
+        self.cache = WorkspaceCache(3)
+        patcher = mock.patch("users.workspace_service._workspace_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_least_recently_used_entry_is_evicted_at_the_size_limit(self):
+        for project_id in (1, 2, 3):
+            self.cache.put((project_id, "hash"), {"title": project_id})
+        self.cache.get((1, "hash"))
+        self.cache.put((4, "hash"), {"title": 4})
+        self.assertEqual(list(self.cache.entries), [(3, "hash"), (1, "hash"), (4, "hash")])
+        self.assertIsNone(self.cache.get((2, "hash")))
+
+    def test_save_replaces_the_older_version_and_delete_forgets_it(self):
+        project = make_project("Chat App", task_checklist="Design\nBuild")
+        self.assertEqual(list(self.cache.entries), [(project.pk, project.content_hash)])
+        self.assertEqual(get_workspace(project)["task_items"], ["Design", "Build"])
+
+        project.task_checklist = "Design\nBuild\nShip"
+        project.save()
+        self.assertEqual(list(self.cache.entries), [(project.pk, project.content_hash)])
+        self.assertEqual(get_workspace(project)["task_items"], ["Design", "Build", "Ship"])
+
+        project.delete()
+        self.assertEqual(list(self.cache.entries), [])
+
+    def test_size_zero_disables_the_cache(self):
+        disabled = WorkspaceCache(0)
+        with mock.patch("users.workspace_service._workspace_cache", disabled):
+            project = make_project("Chat App", task_checklist="Design")
+            self.assertEqual(get_workspace(project)["task_items"], ["Design"])
+        self.assertEqual(list(disabled.entries), [])
+
+
+class StartWorkspaceViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("builder", password="pw")
+        cls.project = make_project("Chat App", task_checklist="Design\nBuild\nTest\nShip")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["recommendations"] = [{"id": self.project.id, "title": "Chat App", "category": "Web Development", "stack": ["Python"]}]
+        session.save()
+
+    def counts(self, response):
+        self.assertEqual(response.status_code, 200)
+        return response.context["completed_tasks"], response.context["total_tasks"], response.context["workspace"]["task_items"]
+
+    def test_both_start_views_render_the_same_workspace(self):
+        urls = [reverse("start_project", args=[self.project.id]), reverse("start_recommendation", args=[0])]
+        self.assertEqual([self.counts(self.client.get(url)) for url in urls], [(0, 4, ["Design", "Build", "Test", "Ship"])] * 2)
+        self.assertEqual(
+            [self.counts(self.client.post(url, {"task": ["1", "3"]})) for url in urls],
+            [(2, 4, ["Design", "Build", "Test", "Ship"])] * 2,
+        )
+        # Progress is kept per saved project and survives a reload.
+        self.assertEqual([self.counts(self.client.get(url))[:2] for url in urls], [(2, 4)] * 2)
+        self.assertEqual(SavedProject.objects.filter(user=self.user).count(), 2)
+
+
+class ExpireSubscriptionsCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        plan, _ = Plan.objects.update_or_create(name="Pro Monthly", defaults={"price": 10})
+        today = timezone.now().date()
+        users = [User.objects.create_user(f"sub-{index}") for index in range(10)]
+        Subscription.objects.bulk_create(
+            [Subscription(user=user, plan=plan, end_date=today - timezone.timedelta(days=index + 1)) for index, user in enumerate(users[:7])]
+            + [
+                Subscription(user=users[7], plan=plan, end_date=today),
+                Subscription(user=users[8], plan=plan, end_date=today + timezone.timedelta(days=3)),
+                Subscription(user=users[9], plan=plan, end_date=today - timezone.timedelta(days=2), is_active=False),
+            ]
+        )
+        cls.current_users = {users[7].id, users[8].id}
+
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command("expire_subscriptions", *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        with self.assertNumQueries(1):
+            self.assertIn("expired=7", self.run_command("--dry-run"))
+        self.assertEqual(Subscription.objects.filter(is_active=True).count(), 9)
+
+    def test_batches_cover_every_expired_row(self):
+        self.assertIn("expired=7 batches=3", self.run_command("--batch-size", "3"))
+        self.assertEqual(set(Subscription.objects.filter(is_active=True).values_list("user_id", flat=True)), self.current_users)
+        self.assertIn("expired=0 batches=0", self.run_command())
+
+    def test_batch_size_must_be_positive(self):
+        with self.assertRaises(CommandError):
+            self.run_command("--batch-size", "0")
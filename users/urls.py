@@ -7,6 +7,7 @@ urlpatterns = [
     path("", views.home_view, name="home"),
     path("plans/", views.plans_view, name="plans"),
     path("project-library/", views.project_library_view, name="project_library"),
+    path("project-library/more/", views.project_library_more_view, name="project_library_more"),
     path("resources/", views.resources_view, name="resources"),
     path("projects/", views.projects_view, name="projects"),
     path("recommendations/", views.recommendations_view, name="recommendations"),
@@ -18,6 +19,7 @@ urlpatterns = [
     path("profile/", views.profile_view, name="profile_view"),
     path("profile/edit/", views.profile_create_or_update, name="profile_edit"),
     path("profile/request-premium/", views.request_premium_view, name="request_premium"),
+    path("ops/query-metrics/", views.query_metrics_view, name="query_metrics"),
 
     path("login/", auth_views.LoginView.as_view(authentication_form=CustomAuthenticationForm), name="login"),
     path("logout/", auth_views.LogoutView.as_view(), name="logout"),
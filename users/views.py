@@ -1,55 +1,72 @@
-from datetime import timedelta
+import base64
+import json
 from collections import OrderedDict
-from django.utils import timezone
 from django.db.utils import OperationalError
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.functional import cached_property
+from .billing_service import BillingState, aget_plan_ids, aload_billing_state
+from .catalog_version import get_catalog_version
+from .db_router import read_replica
 from .forms import SignUpForm, UserAccountForm, UserProfileForm
-from .models import DailyRecommendationUsage, Plan, PremiumRequest, Project, Subscription, UserProfile
-from .recommendation_service import recommend_projects_for_profile
-
-
-def home_view(request):
-    pro_monthly_id = Plan.objects.filter(name__iexact="Pro Monthly").values_list("id", flat=True).first()
-    pro_yearly_id = Plan.objects.filter(name__iexact="Pro Yearly").values_list("id", flat=True).first()
-    active_subscription = None
-    premium_request = None
-    pending_plan_id = None
-    active_plan_id = None
-    approved_plan_id = None
+from .models import Plan, PremiumRequest, Project, SavedProject, UserProfile
+from .page_cache import cache_anonymous_page, page_cache_timeout
+from .query_metrics import query_metrics_snapshot, reset_query_metrics, sample_rate
+from .quota_service import consume_recommendation_quota
+from .recommendation_cache import get_cached_recommendations, invalidate_user_recommendations
+from .saved_project_service import (
+    can_save_another,
+    get_completed_task_ids,
+    get_saved_project,
+    import_session_projects,
+    reset_phases,
+    save_project,
+    set_completed_task_ids,
+)
+from .search_service import search_projects
+from .subscription_service import (
+    aget_user_subscription_tier,
+    get_active_subscription,
+    get_user_subscription_tier,
+)
+from .workspace_service import build_task_phases, build_workspace_payload, workspace_progress
+
+
+@read_replica
+@cache_anonymous_page("home")
+async def home_view(request):
+    request.user = user = await request.auser()
+    plan_ids = await aget_plan_ids()
+    billing = BillingState()
     premium_request_error = ""
     premium_request_success = ""
-    if request.user.is_authenticated:
-        active_subscription = _get_active_subscription(request.user)
-        premium_request = _get_latest_premium_request(request.user)
-        pending_request = _get_pending_premium_request(request.user)
-        if pending_request:
-            pending_plan_id = pending_request.plan_id
-        if active_subscription and active_subscription.plan and active_subscription.plan.price > 0:
-            active_plan_id = active_subscription.plan_id
-        approved_request = _get_latest_approved_premium_request(request.user)
-        if approved_request:
-            approved_plan_id = approved_request.plan_id
-        premium_request_error = request.session.pop("premium_request_error", "")
-        premium_request_success = request.session.pop("premium_request_success", "")
-    return render(
+    if user.is_authenticated:
+        billing = await aload_billing_state(user)
+        premium_request_error = await request.session.apop("premium_request_error", "")
+        premium_request_success = await request.session.apop("premium_request_success", "")
+    return await sync_to_async(render)(
         request,
         "users/home.html",
         {
-            "active_subscription": active_subscription,
-            "active_plan_id": active_plan_id,
-            "approved_plan_id": approved_plan_id,
-            "premium_request": premium_request,
-            "pending_plan_id": pending_plan_id,
+            "active_subscription": billing.active_subscription,
+            "active_plan_id": billing.active_plan_id,
+            "approved_plan_id": billing.approved_plan_id,
+            "premium_request": billing.premium_request,
+            "pending_plan_id": billing.pending_plan_id,
             "premium_request_error": premium_request_error,
             "premium_request_success": premium_request_success,
-            "pro_monthly_id": pro_monthly_id,
-            "pro_yearly_id": pro_yearly_id,
+            "pro_monthly_id": plan_ids.get("pro monthly"),
+            "pro_yearly_id": plan_ids.get("pro yearly"),
         },
     )
 
@@ -59,92 +76,145 @@ def _split_csv_tags(value):
 
 
 def _project_to_card(project_record):
+    tokens = project_record.match_tokens
+    if tokens:
+        tags = tokens["stack"][:3] or tokens["labels"][:3]
+    else:
+        tags = _split_csv_tags(project_record.tech_preference)[:3] or _split_csv_tags(project_record.interest_tags)[:3]
     return {
         "id": project_record.id,
         "title": project_record.title,
         "summary": project_record.description,
         "difficulty": project_record.get_skill_level_display(),
         "plan": project_record.get_required_plan_display(),
-        "tags": _split_csv_tags(project_record.tech_preference)[:3] or _split_csv_tags(project_record.interest_tags)[:3],
+        "tags": tags,
     }
 
 
-def projects_view(request):
-    query = str(request.GET.get("q") or "").strip()
-    projects_qs = Project.objects.all()
-    user_tier = "explorer"
+class _ProjectListing:
+    """Grouped catalog cards, queried only if the template fragment is not cached."""
 
-    if request.user.is_authenticated:
-        user_tier, _ = _get_user_subscription_tier(request.user)
+    def __init__(self, user_tier, query):
+        self.user_tier = user_tier
+        self.query = query
 
-    if user_tier == "explorer":
-        projects_qs = projects_qs.filter(required_plan="explorer")
+    @cached_property
+    def records(self):
+        projects_qs = Project.objects.all()
+        if self.user_tier == "explorer":
+            projects_qs = projects_qs.filter(required_plan="explorer")
 
-    if query:
-        projects_qs = projects_qs.filter(
-            Q(title__icontains=query)
-            | Q(description__icontains=query)
-            | Q(field__icontains=query)
-            | Q(target_role__icontains=query)
-            | Q(tech_preference__icontains=query)
-            | Q(interest_tags__icontains=query)
-        )
+        if self.query:
+            # Best matches first; categories appear in the order of their best match.
+            return search_projects(projects_qs, self.query)
+        return list(projects_qs.order_by("library_field", "title", "id"))
 
-    projects_qs = projects_qs.order_by("field", "title", "id")
+    @cached_property
+    def groups(self):
+        grouped = OrderedDict()
+        for project_record in self.records:
+            grouped.setdefault(project_record.library_field, []).append(_project_to_card(project_record))
+        return [{"name": name, "projects": items} for name, items in grouped.items()]
 
-    grouped = OrderedDict()
-    for project_record in projects_qs:
-        field_name = str(project_record.field or "General").strip() or "General"
-        grouped.setdefault(field_name, []).append(_project_to_card(project_record))
+    @property
+    def count(self):
+        return len(self.records)
 
-    project_groups = [{"name": name, "projects": items} for name, items in grouped.items()]
 
-    return render(
+@read_replica
+@cache_anonymous_page("projects", query_params=("q",))
+async def projects_view(request):
+    query = str(request.GET.get("q") or "").strip()
+    user_tier = "explorer"
+
+    request.user = user = await request.auser()
+    if user.is_authenticated:
+        user_tier, _ = await aget_user_subscription_tier(user, request=request)
+
+    # The listing is lazy: it queries while the template renders, and only
+    # when the card fragment is not cached.
+    return await sync_to_async(render)(
         request,
         "users/projects.html",
         {
-            "project_groups": project_groups,
-            "project_count": projects_qs.count(),
+            "listing": _ProjectListing(user_tier, query),
             "search_query": query,
             "is_explorer_view": user_tier == "explorer",
+            "user_tier": user_tier,
+            "catalog_version": await sync_to_async(get_catalog_version)(),
+            "cards_cache_timeout": page_cache_timeout(),
         },
     )
 
 
-@login_required(login_url="login")
-def project_library_view(request):
-    user_tier = "explorer"
-    if request.user.is_authenticated:
-        user_tier, _ = _get_user_subscription_tier(request.user)
+LIBRARY_CARD_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "field",
+    "library_field",
+    "skill_level",
+    "required_plan",
+    "tech_preference",
+    "interest_tags",
+    "match_tokens",
+)
 
-    per_category_limit = 2 if user_tier == "explorer" else 5
-    projects_qs = Project.objects.all()
+
+def _library_projects(user_tier):
+    projects_qs = Project.objects.only(*LIBRARY_CARD_COLUMNS)
     if user_tier == "explorer":
         projects_qs = projects_qs.filter(required_plan="explorer")
+    return projects_qs
 
-    projects_qs = projects_qs.order_by("field", "title", "id")
 
-    grouped = OrderedDict()
-    grouped_total = {}
+def _encode_library_cursor(project_record):
+    payload = json.dumps([project_record.library_field, project_record.title, project_record.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
 
-    for project_record in projects_qs:
-        field_name = str(project_record.field or "General").strip() or "General"
-        grouped_total[field_name] = grouped_total.get(field_name, 0) + 1
 
-        cards = grouped.setdefault(field_name, [])
-        if len(cards) < per_category_limit:
-            cards.append(_project_to_card(project_record))
+def _decode_library_cursor(cursor):
+    try:
+        library_field, title, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(library_field), str(title), int(project_id)
+    except (ValueError, TypeError, UnicodeError):
+        return None
 
-    library_groups = [
-        {
-            "name": name,
-            "projects": projects,
-            "total": grouped_total.get(name, len(projects)),
-        }
-        for name, projects in grouped.items()
-    ]
 
-    return render(
+@read_replica
+@login_required(login_url="login")
+async def project_library_view(request):
+    request.user = user = await request.auser()
+    user_tier, _ = await aget_user_subscription_tier(user, request=request)
+
+    per_category_limit = 2 if user_tier == "explorer" else 5
+    projects_qs = (
+        _library_projects(user_tier)
+        .annotate(
+            category_row=Window(RowNumber(), partition_by=[F("library_field")], order_by=[F("title").asc(), F("id").asc()]),
+            category_total=Window(Count("id"), partition_by=[F("library_field")]),
+        )
+        .filter(category_row__lte=per_category_limit)
+        .order_by("library_field", "title", "id")
+    )
+
+    grouped = OrderedDict()
+    async for project_record in projects_qs:
+        grouped.setdefault(project_record.library_field, []).append(project_record)
+
+    library_groups = []
+    for name, records in grouped.items():
+        total = records[0].category_total
+        library_groups.append(
+            {
+                "name": name,
+                "projects": [_project_to_card(project_record) for project_record in records],
+                "total": total,
+                "next_cursor": _encode_library_cursor(records[-1]) if total > len(records) else "",
+            }
+        )
+
+    return await sync_to_async(render)(
         request,
         "users/project_library.html",
         {
@@ -155,6 +225,33 @@ def project_library_view(request):
     )
 
 
+@read_replica
+@login_required(login_url="login")
+def project_library_more_view(request):
+    user_tier, _ = get_user_subscription_tier(request.user, request=request)
+    page_size = 2 if user_tier == "explorer" else 5
+    after = _decode_library_cursor(str(request.GET.get("cursor") or ""))
+    if after is None:
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+
+    library_field, title, project_id = after
+    page = list(
+        _library_projects(user_tier)
+        .filter(library_field=library_field)
+        .filter(Q(title__gt=title) | Q(title=title, id__gt=project_id))
+        .order_by("title", "id")[: page_size + 1]
+    )
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    html = render_to_string(
+        "users/project_library_cards.html",
+        {"projects": [_project_to_card(project_record) for project_record in page]},
+        request=request,
+    )
+    return JsonResponse({"html": html, "next_cursor": _encode_library_cursor(page[-1]) if has_more else ""})
+
+
 def resources_view(request):
     return render(request, "users/resources.html")
 
@@ -198,125 +295,8 @@ def _build_default_phases(project):
         },
     ]
 
-def _split_lines(value):
-    lines = []
-    for raw_line in str(value or "").splitlines():
-        line = raw_line.strip().lstrip("-•").strip()
-        if line:
-            lines.append(line)
-    return lines
-
-
-def _parse_resources(value):
-    resources = []
-    for line in _split_lines(value):
-        if "|" in line:
-            title, url = [item.strip() for item in line.split("|", 1)]
-            resources.append({"title": title or url, "url": url})
-            continue
-        resources.append({"title": line, "url": line if line.startswith("http") else ""})
-    return resources
-
-
-def _build_workspace_payload(project_record, fallback_project):
-    if project_record:
-        objectives = _split_lines(project_record.learning_objectives)
-        if not objectives and project_record.learning_goal:
-            objectives = [project_record.learning_goal]
-
-        tasks = _split_lines(project_record.task_checklist)
-        if not tasks:
-            tasks = [
-                "Review project requirements and success criteria",
-                "Set up the development workspace",
-                "Implement the main workflow",
-                "Validate results and document outcomes",
-            ]
-
-        return {
-            "title": project_record.title,
-            "full_description": project_record.description,
-            "required_tech_stack": [item.strip() for item in str(project_record.tech_preference).split(",") if item.strip()],
-            "learning_objectives": objectives,
-            "resources": _parse_resources(project_record.resources),
-            "task_items": tasks,
-            "detailed_roadmap": _split_lines(project_record.detailed_roadmap),
-            "premium_hints": _split_lines(project_record.premium_hints),
-        }
-
-    return {
-        "title": fallback_project.get("title", "Project"),
-        "full_description": fallback_project.get("summary", ""),
-        "required_tech_stack": [item.strip() for item in fallback_project.get("stack", []) if str(item).strip()],
-        "learning_objectives": ["Build practical experience through guided tasks"],
-        "resources": [],
-        "task_items": [
-            "Review project scope",
-            "Build the first working version",
-            "Test and improve quality",
-        ],
-        "detailed_roadmap": [],
-        "premium_hints": [],
-    }
-
-
-def _build_phases_from_tasks(project, task_items):
-    tasks = []
-    for idx, item in enumerate(task_items, start=1):
-        tasks.append({"id": idx, "description": item, "steps": [], "learn": "", "key_terms": []})
-    phases = [
-        {
-            "title": "Task Checklist",
-            "description": f"Core tasks for {project.get('title', 'your project')}.",
-            "resources": [],
-            "tasks": tasks,
-        }
-    ]
-    return phases
-
-
-def _tier_from_plan_name(plan_name):
-    name = str(plan_name or "").strip().lower()
-    if "yearly" in name:
-        return "pro_yearly"
-    if "pro" in name or "monthly" in name:
-        return "pro_monthly"
-    return "explorer"
-
-
-def _get_user_subscription_tier(user):
-    active_subscription = _get_active_subscription(user)
-    if active_subscription and active_subscription.plan and active_subscription.plan.price > 0:
-        return _tier_from_plan_name(active_subscription.plan.name), active_subscription.plan.name
-
-    approved_request = (
-        PremiumRequest.objects.filter(user=user, status="approved", plan__price__gt=0)
-        .select_related("plan")
-        .order_by("-reviewed_at", "-requested_at", "-id")
-        .first()
-    )
-    if not approved_request or not approved_request.plan:
-        return "explorer", "Explorer"
-
-    tier = _tier_from_plan_name(approved_request.plan.name)
-    duration_days = 365 if tier == "pro_yearly" else 30
-    approved_at = approved_request.reviewed_at or approved_request.requested_at
-    if not approved_at:
-        return tier, approved_request.plan.name
-
-    expires_at = approved_at.date() + timedelta(days=duration_days)
-    if expires_at >= timezone.now().date():
-        return tier, approved_request.plan.name
-    return "explorer", "Explorer"
-
-
-def _get_active_subscription(user):
-    Subscription.objects.filter(is_active=True, end_date__lt=timezone.now().date()).update(is_active=False)
-    return Subscription.objects.filter(user=user, is_active=True, end_date__gte=timezone.now().date()).select_related("plan").first()
-
-
-def _is_premium(user):
-    tier, _ = _get_user_subscription_tier(user)
+def _is_premium(request):
+    tier, _ = get_user_subscription_tier(request.user, request=request)
     return tier != "explorer"
 
 
@@ -327,54 +307,36 @@ def _get_latest_premium_request(user):
         return None
 
 
-def _get_pending_premium_request(user):
-    try:
-        return PremiumRequest.objects.filter(user=user, status="pending").order_by("-requested_at", "-id").first()
-    except OperationalError:
-        return None
-
-
-def _get_latest_approved_premium_request(user):
-    try:
-        return PremiumRequest.objects.filter(user=user, status="approved").order_by("-reviewed_at", "-id").first()
-    except OperationalError:
-        return None
-
-
 def plans_view(request):
     return redirect(f"{reverse('home')}#plans")
 
 
 @login_required
-def recommendations_view(request):
-    profile = UserProfile.objects.filter(user=request.user).first()
+async def recommendations_view(request):
+    request.user = user = await request.auser()
     recommendations = []
     ai_generated = False
     reco_limited = False
     reco_limit = 6
     remaining = None
     premium_request_pending = False
-    user_plan_tier, current_plan_name = _get_user_subscription_tier(request.user)
+    profile = await UserProfile.objects.filter(user=user).afirst()
+    user_plan_tier, current_plan_name = await aget_user_subscription_tier(user, request=request)
     is_premium_user = user_plan_tier != "explorer"
 
     if profile:
-        premium_request_pending = PremiumRequest.objects.filter(user=request.user, status="pending").exists()
         is_premium = is_premium_user
         reco_limit = 6 if is_premium else 3
 
-        usage_record = None
+        usage_count = None
+        premium_request_pending = await PremiumRequest.objects.filter(user=user, status="pending").aexists()
         if not is_premium:
-            usage_record, _ = DailyRecommendationUsage.objects.get_or_create(
-                user=request.user,
-                usage_date=timezone.localdate(),
-                defaults={"count": 0},
-            )
+            usage_count, reco_limited = await sync_to_async(consume_recommendation_quota)(user, reco_limit)
 
-        if not is_premium and usage_record and usage_record.count >= reco_limit:
-            reco_limited = True
-            recommendations = request.session.get("recommendations", [])[:reco_limit]
+        if reco_limited:
+            recommendations = (await request.session.aget("recommendations", []))[:reco_limit]
             remaining = 0
-            return render(
+            return await sync_to_async(render)(
                 request,
                 "users/recommendations.html",
                 {
@@ -389,15 +351,13 @@ def recommendations_view(request):
                     "is_premium_user": is_premium_user,
                 },
             )
-        recommendations = recommend_projects_for_profile(profile, limit=reco_limit, user_plan_tier=user_plan_tier)
+        recommendations = await sync_to_async(get_cached_recommendations)(profile, limit=reco_limit, user_plan_tier=user_plan_tier)
 
-        request.session["recommendations"] = recommendations
-        if not is_premium and usage_record:
-            usage_record.count += 1
-            usage_record.save(update_fields=["count"])
-            remaining = max(reco_limit - usage_record.count, 0)
+        await request.session.aset("recommendations", recommendations)
+        if usage_count is not None:
+            remaining = max(reco_limit - usage_count, 0)
 
-    return render(
+    return await sync_to_async(render)(
         request,
         "users/recommendations.html",
         {
@@ -414,112 +374,81 @@ def recommendations_view(request):
     )
 
 
-@login_required
-@login_required
-def start_recommendation_view(request, index):
-    recommendations = request.session.get("recommendations", [])
-    if not recommendations or index < 0 or index >= len(recommendations):
-        return redirect("recommendations")
+def _ensure_saved_project(request, key, **fields):
+    """Return the user's saved project ``key``, creating it if the plan allows; ``None`` when it does not."""
+    import_session_projects(request)
+    saved_project = get_saved_project(request.user, key)
+    if saved_project:
+        return saved_project
+    profile_exists = UserProfile.objects.filter(user=request.user).exists()
+    if profile_exists and not _is_premium(request) and not can_save_another(request.user):
+        request.session["my_projects_error"] = "Free users can save up to 5 projects. Upgrade to premium for unlimited saves."
+        return None
+    return save_project(request.user, key, **fields)
 
-    project = recommendations[index]
-    project_record = Project.objects.filter(id=project.get("id")).first() if project.get("id") else None
-    workspace = _build_workspace_payload(project_record, project)
-    is_premium_user = _is_premium(request.user)
-    profile = UserProfile.objects.filter(user=request.user).first()
-    project_id = f"rec-{index}"
-    my_projects = request.session.get("my_projects", {})
-    if profile and not _is_premium(request.user) and project_id not in my_projects:
-        if len(my_projects) >= 5:
-            request.session["my_projects_error"] = "Free users can save up to 5 projects. Upgrade to premium for unlimited saves."
-            return redirect("my_projects")
-    if project_id not in my_projects:
-        my_projects[project_id] = {
-            "source": "recommendation",
-            "index": index,
-            "title": project.get("title"),
-            "category": project.get("category"),
-            "difficulty": project.get("difficulty"),
-            "summary": project.get("summary"),
-        }
-        request.session["my_projects"] = my_projects
-
-    phases_key = f"phases_{project_id}"
-    progress_key = f"progress_{project_id}"
-
-    if request.GET.get("regen") == "1" or phases_key not in request.session:
-        request.session.pop(progress_key, None)
-        phases = _build_phases_from_tasks(project, workspace.get("task_items", []))
-        if phases:
-            request.session[phases_key] = phases
-        else:
-            phases = []
+
+def _render_workspace(request, project, workspace, saved_project):
+    if request.GET.get("regen") == "1" or not saved_project.phases:
+        reset_phases(saved_project, build_task_phases(project, workspace.get("task_items", [])))
+        completed = set()
     else:
-        phases = request.session.get(phases_key, [])
+        completed = get_completed_task_ids(saved_project)
 
-    completed = set(request.session.get(progress_key, []))
     if request.method == "POST":
-        completed = set(map(int, request.POST.getlist("task")))
-        request.session[progress_key] = list(completed)
-
-    total_tasks = 0
-    completed_tasks = 0
-    rendered_phases = []
-
-    for phase in phases:
-        tasks = []
-        for task in phase.get("tasks", []):
-            task_id = task.get("id")
-            is_done = task_id in completed
-            total_tasks += 1
-            if is_done:
-                completed_tasks += 1
-            tasks.append(
-                {
-                    "id": task_id,
-                    "description": task.get("description"),
-                    "steps": task.get("steps", []),
-                    "learn": task.get("learn", ""),
-                    "key_terms": task.get("key_terms", []),
-                    "done": is_done,
-                }
-            )
-        rendered_phases.append(
-            {
-                "title": phase.get("title"),
-                "description": phase.get("description"),
-                "resources": phase.get("resources", []),
-                "tasks": tasks,
-            }
-        )
+        completed = set_completed_task_ids(saved_project, map(int, request.POST.getlist("task")))
 
-    progress_pct = int((completed_tasks / total_tasks) * 100) if total_tasks else 0
-    ai_error = not rendered_phases
-    ai_error_detail = ""
+    progress = workspace_progress(saved_project.phases, completed)
 
     return render(
         request,
         "users/project_start.html",
         {
             "project": project,
-            "phases": rendered_phases,
-            "progress_pct": progress_pct,
-            "completed_tasks": completed_tasks,
-            "total_tasks": total_tasks,
-            "ai_error": ai_error,
-            "ai_error_detail": ai_error_detail,
+            "phases": progress.phases,
+            "progress_pct": progress.progress_pct,
+            "completed_tasks": progress.completed_tasks,
+            "total_tasks": progress.total_tasks,
+            "ai_error": not progress.phases,
+            "ai_error_detail": "",
             "workspace": workspace,
-            "is_premium_user": is_premium_user,
+            "is_premium_user": _is_premium(request),
         },
     )
 
 
+@login_required
+@login_required
+def start_recommendation_view(request, index):
+    recommendations = request.session.get("recommendations", [])
+    if not recommendations or index < 0 or index >= len(recommendations):
+        return redirect("recommendations")
+
+    project = recommendations[index]
+    project_record = Project.objects.filter(id=project.get("id")).first() if project.get("id") else None
+    workspace = build_workspace_payload(project_record, project)
+    saved_project = _ensure_saved_project(
+        request,
+        f"rec-{index}",
+        source="recommendation",
+        project=project_record,
+        recommendation_index=index,
+        title=str(project.get("title") or "")[:140],
+        category=str(project.get("category") or "")[:100],
+        difficulty=str(project.get("difficulty") or "")[:20],
+        summary=project.get("summary") or "",
+    )
+    if saved_project is None:
+        return redirect("my_projects")
+    return _render_workspace(request, project, workspace, saved_project)
+
+
 @login_required
 def start_project_view(request, project_id):
     project_record = Project.objects.filter(id=project_id).first()
     if not project_record:
         return redirect("projects")
 
-    if project_record.required_plan != "explorer" and not _is_premium(request.user):
+    if project_record.required_plan != "explorer" and not _is_premium(request):
         request.session["premium_request_error"] = "This project requires a premium plan."
         return redirect("plans")
 
@@ -531,130 +460,51 @@ def start_project_view(request, project_id):
         "summary": project_record.description,
         "stack": _split_csv_tags(project_record.tech_preference),
     }
-    workspace = _build_workspace_payload(project_record, project)
-    is_premium_user = _is_premium(request.user)
-    profile = UserProfile.objects.filter(user=request.user).first()
-
-    saved_project_id = f"catalog-{project_record.id}"
-    my_projects = request.session.get("my_projects", {})
-    if profile and not _is_premium(request.user) and saved_project_id not in my_projects:
-        if len(my_projects) >= 5:
-            request.session["my_projects_error"] = "Free users can save up to 5 projects. Upgrade to premium for unlimited saves."
-            return redirect("my_projects")
-    if saved_project_id not in my_projects:
-        my_projects[saved_project_id] = {
-            "source": "catalog",
-            "project_pk": project_record.id,
-            "title": project.get("title"),
-            "category": project.get("category"),
-            "difficulty": project.get("difficulty"),
-            "summary": project.get("summary"),
-        }
-        request.session["my_projects"] = my_projects
-
-    phases_key = f"phases_{saved_project_id}"
-    progress_key = f"progress_{saved_project_id}"
-
-    if request.GET.get("regen") == "1" or phases_key not in request.session:
-        request.session.pop(progress_key, None)
-        phases = _build_phases_from_tasks(project, workspace.get("task_items", []))
-        if phases:
-            request.session[phases_key] = phases
-        else:
-            phases = []
-    else:
-        phases = request.session.get(phases_key, [])
-
-    completed = set(request.session.get(progress_key, []))
-    if request.method == "POST":
-        completed = set(map(int, request.POST.getlist("task")))
-        request.session[progress_key] = list(completed)
-
-    total_tasks = 0
-    completed_tasks = 0
-    rendered_phases = []
-
-    for phase in phases:
-        tasks = []
-        for task in phase.get("tasks", []):
-            task_id = task.get("id")
-            is_done = task_id in completed
-            total_tasks += 1
-            if is_done:
-                completed_tasks += 1
-            tasks.append(
-                {
-                    "id": task_id,
-                    "description": task.get("description"),
-                    "steps": task.get("steps", []),
-                    "learn": task.get("learn", ""),
-                    "key_terms": task.get("key_terms", []),
-                    "done": is_done,
-                }
-            )
-        rendered_phases.append(
-            {
-                "title": phase.get("title"),
-                "description": phase.get("description"),
-                "resources": phase.get("resources", []),
-                "tasks": tasks,
-            }
-        )
-
-    progress_pct = int((completed_tasks / total_tasks) * 100) if total_tasks else 0
-    ai_error = not rendered_phases
-    ai_error_detail = ""
-
-    return render(
+    workspace = build_workspace_payload(project_record, project)
+    saved_project = _ensure_saved_project(
         request,
-        "users/project_start.html",
-        {
-            "project": project,
-            "phases": rendered_phases,
-            "progress_pct": progress_pct,
-            "completed_tasks": completed_tasks,
-            "total_tasks": total_tasks,
-            "ai_error": ai_error,
-            "ai_error_detail": ai_error_detail,
-            "workspace": workspace,
-            "is_premium_user": is_premium_user,
-        },
+        f"catalog-{project_record.id}",
+        source="catalog",
+        project=project_record,
+        title=project_record.title,
+        category=project_record.field,
+        difficulty=project_record.skill_level,
+        summary=project_record.description,
     )
+    if saved_project is None:
+        return redirect("my_projects")
+    return _render_workspace(request, project, workspace, saved_project)
 
 
 @login_required
 def my_projects_view(request):
-    my_projects = request.session.get("my_projects", {})
+    import_session_projects(request)
     my_projects_error = request.session.pop("my_projects_error", "")
+    saved_projects = SavedProject.objects.filter(user=request.user).defer("phases")
     items = []
 
-    for project_id, project in my_projects.items():
-        phases = request.session.get(f"phases_{project_id}", [])
-        completed = set(request.session.get(f"progress_{project_id}", []))
-        total_tasks = sum(len(phase.get("tasks", [])) for phase in phases)
-        completed_tasks = sum(1 for phase in phases for task in phase.get("tasks", []) if task.get("id") in completed)
-        progress_pct = int((completed_tasks / total_tasks) * 100) if total_tasks else 0
-        if project.get("source") == "showcase":
+    for saved_project in saved_projects:
+        if saved_project.source == "showcase":
             # Legacy entries from old sessions now redirect to the catalog page.
             start_url = reverse("projects")
-        elif project.get("source") == "catalog" and project.get("project_pk"):
-            start_url = reverse("start_project", args=[project.get("project_pk")])
+        elif saved_project.source == "catalog" and saved_project.project_id:
+            start_url = reverse("start_project", args=[saved_project.project_id])
         else:
-            start_url = reverse("start_recommendation", args=[project.get("index")])
+            start_url = reverse("start_recommendation", args=[saved_project.recommendation_index or 0])
         items.append(
             {
-                "id": project_id,
-                "index": project.get("index"),
-                "source": project.get("source", "recommendation"),
+                "id": saved_project.key,
+                "index": saved_project.recommendation_index,
+                "source": saved_project.source,
                 "start_url": start_url,
                 "regen_url": f"{start_url}?regen=1",
-                "title": project.get("title"),
-                "category": project.get("category"),
-                "difficulty": project.get("difficulty"),
-                "summary": project.get("summary"),
-                "progress_pct": progress_pct,
-                "completed_tasks": completed_tasks,
-                "total_tasks": total_tasks,
+                "title": saved_project.title,
+                "category": saved_project.category,
+                "difficulty": saved_project.difficulty,
+                "summary": saved_project.summary,
+                "progress_pct": saved_project.progress_pct,
+                "completed_tasks": saved_project.completed_tasks,
+                "total_tasks": saved_project.total_tasks,
             }
         )
 
@@ -670,7 +520,7 @@ def request_premium_view(request):
             request.session["premium_request_error"] = "Please choose a paid plan to request premium access."
             return redirect("plans")
 
-        active_subscription = _get_active_subscription(request.user)
+        active_subscription = get_active_subscription(request.user)
         if active_subscription and active_subscription.plan and active_subscription.plan.price > 0:
             request.session["premium_request_error"] = (
                 f"You already have an active {active_subscription.plan.name} subscription until "
@@ -694,12 +544,8 @@ def remove_my_project_view(request, project_id):
     if request.method != "POST":
         return redirect("my_projects")
 
-    my_projects = request.session.get("my_projects", {})
-    if project_id in my_projects:
-        my_projects.pop(project_id, None)
-        request.session["my_projects"] = my_projects
-        request.session.pop(f"phases_{project_id}", None)
-        request.session.pop(f"progress_{project_id}", None)
+    import_session_projects(request)
+    SavedProject.objects.filter(user=request.user, key=project_id).delete()
 
     return redirect("my_projects")
 
@@ -742,6 +588,7 @@ def profile_create_or_update(request):
             user_profile = profile_form.save(commit=False)
             user_profile.user = request.user
             user_profile.save()
+            invalidate_user_recommendations(request.user.id)
             return redirect(f"{reverse('profile_view')}?saved=1")
     else:
         account_form = UserAccountForm(instance=request.user)
@@ -755,4 +602,16 @@ def profile_create_or_update(request):
             "profile_form": profile_form,
             "profile": profile,
         },
-    )
\ No newline at end of file
+    )
+
+
+@staff_member_required
+def query_metrics_view(request):
+    """Per-view query metrics recorded by this process; POST clears them."""
+    if request.method == "POST":
+        reset_query_metrics()
+    try:
+        top = max(1, int(request.GET.get("top", 5)))
+    except ValueError:
+        top = 5
+    return JsonResponse({"sample_rate": sample_rate(), "views": query_metrics_snapshot(top)})
@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+
+DEFAULT_TASK_ITEMS = [
+    "Review project requirements and success criteria",
+    "Set up the development workspace",
+    "Implement the main workflow",
+    "Validate results and document outcomes",
+]
+
+FALLBACK_TASK_ITEMS = [
+    "Review project scope",
+    "Build the first working version",
+    "Test and improve quality",
+]
+
+
+def split_lines(value):
+    lines = []
+    for raw_line in str(value or "").splitlines():
+        line = raw_line.strip().lstrip("-•").strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def parse_resources(value):
+    resources = []
+    for line in split_lines(value):
+        if "|" in line:
+            title, url = [item.strip() for item in line.split("|", 1)]
+            resources.append({"title": title or url, "url": url})
+            continue
+        resources.append({"title": line, "url": line if line.startswith("http") else ""})
+    return resources
+
+
+def parse_workspace(project_record):
+    objectives = split_lines(project_record.learning_objectives)
+    if not objectives and project_record.learning_goal:
+        objectives = [project_record.learning_goal]
+
+    return {
+        "title": project_record.title,
+        "full_description": project_record.description,
+        "required_tech_stack": [item.strip() for item in str(project_record.tech_preference).split(",") if item.strip()],
+        "learning_objectives": objectives,
+        "resources": parse_resources(project_record.resources),
+        "task_items": split_lines(project_record.task_checklist) or list(DEFAULT_TASK_ITEMS),
+        "detailed_roadmap": split_lines(project_record.detailed_roadmap),
+        "premium_hints": split_lines(project_record.premium_hints),
+    }
+
+
+class WorkspaceCache:
+    """Process-local LRU of parsed workspaces keyed by ``(project id, content hash)``.
+
+    A project's text only changes through a save or an import, both of which
+    change ``content_hash``, so an entry can never be served for stale text.
+    Cached payloads are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+            return payload
+
+    def put(self, key, payload):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            # Only the newest version of a project is worth keeping.
+            for stale_key in [k for k in self.entries if k[0] == key[0] and k != key]:
+                del self.entries[stale_key]
+            self.entries[key] = payload
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, project_id):
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == project_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_workspace_cache = WorkspaceCache(getattr(settings, "WORKSPACE_CACHE_SIZE", 512))
+
+
+def _cache_key(project_record):
+    return project_record.pk, project_record.content_hash or project_record.compute_content_hash()
+
+
+def store_workspace(project_record):
+    payload = parse_workspace(project_record)
+    _workspace_cache.put(_cache_key(project_record), payload)
+    return payload
+
+
+def forget_workspace(project_id):
+    _workspace_cache.discard(project_id)
+
+
+def get_workspace(project_record):
+    payload = _workspace_cache.get(_cache_key(project_record))
+    if payload is None:
+        payload = store_workspace(project_record)
+    return payload
+
+
+def build_workspace_payload(project_record, fallback_project):
+    if project_record:
+        return get_workspace(project_record)
+
+    return {
+        "title": fallback_project.get("title", "Project"),
+        "full_description": fallback_project.get("summary", ""),
+        "required_tech_stack": [item.strip() for item in fallback_project.get("stack", []) if str(item).strip()],
+        "learning_objectives": ["Build practical experience through guided tasks"],
+        "resources": [],
+        "task_items": list(FALLBACK_TASK_ITEMS),
+        "detailed_roadmap": [],
+        "premium_hints": [],
+    }
+
+
+@dataclass(slots=True)
+class WorkspaceTask:
+    id: int
+    description: str
+    steps: list
+    learn: str
+    key_terms: list
+    done: bool
+
+
+@dataclass(slots=True)
+class WorkspacePhase:
+    title: str
+    description: str
+    resources: list
+    tasks: list
+
+
+@dataclass(slots=True)
+class WorkspaceProgress:
+    phases: list
+    completed_tasks: int
+    total_tasks: int
+
+    @property
+    def progress_pct(self):
+        return int((self.completed_tasks / self.total_tasks) * 100) if self.total_tasks else 0
+
+
+def build_task_phases(project, task_items):
+    """Stored phase layout for a saved project: one phase listing ``task_items``."""
+    tasks = [
+        {"id": idx, "description": item, "steps": [], "learn": "", "key_terms": []}
+        for idx, item in enumerate(task_items, start=1)
+    ]
+    return [
+        {
+            "title": "Task Checklist",
+            "description": f"Core tasks for {project.get('title', 'your project')}.",
+            "resources": [],
+            "tasks": tasks,
+        }
+    ]
+
+
+def workspace_progress(phases, completed):
+    """Phases ready for ``project_start.html`` with each task's ``done`` flag set from ``completed``."""
+    rendered = []
+    task_ids = []
+    for phase in phases:
+        tasks = []
+        for task in phase.get("tasks", []):
+            task_id = task.get("id")
+            task_ids.append(task_id)
+            tasks.append(
+                WorkspaceTask(
+                    task_id,
+                    task.get("description"),
+                    task.get("steps", []),
+                    task.get("learn", ""),
+                    task.get("key_terms", []),
+                    task_id in completed,
+                )
+            )
+        rendered.append(WorkspacePhase(phase.get("title"), phase.get("description"), phase.get("resources", []), tasks))
+
+    return WorkspaceProgress(rendered, len(completed.intersection(task_ids)), len(task_ids))